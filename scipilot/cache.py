@@ -0,0 +1,113 @@
+"""Content-addressed on-disk cache of execution results."""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .models import Operation, ToolDescriptor
+
+CACHE_FORMAT_VERSION = 1
+
+
+def hash_file(path: Union[Path, str], chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Memoize successful runs on disk.
+
+    Entries are keyed on everything that can change a run's result: the rendered
+    command, the output specs, the tool version, the binary's mtime and size,
+    the state of its conda environment and the contents of file inputs. Entries are JSON files
+    sharded by the first two key characters.
+    """
+
+    def __init__(self, cache_dir: Union[Path, str]):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        command: str,
+        environment: Optional[list[Any]] = None,
+    ) -> str:
+        """Compute the cache key for a run.
+
+        command must be rendered with placeholder working_dir/run_id values so
+        that it does not differ between otherwise identical runs. environment
+        identifies the state of the tool's conda env (prefix, conda-meta mtime).
+        """
+        key_data: dict[str, Any] = {
+            "format": CACHE_FORMAT_VERSION,
+            "tool": tool.name,
+            "version": tool.tool.version,
+            "operation": operation.name,
+            "command": command,
+            "binary": self._binary_fingerprint(tool.tool.binary),
+            "environment": environment,
+            # Extraction settings shape the outputs; stop rules how converged a run had to be
+            "outputs": [out.model_dump() for out in operation.outputs],
+            "files": {},
+        }
+
+        for input_spec in operation.inputs:
+            if input_spec.type != "file":
+                continue
+            value = inputs.get(input_spec.name, input_spec.default)
+            if value and Path(str(value)).is_file():
+                key_data["files"][input_spec.name] = hash_file(str(value))
+
+        encoded = json.dumps(key_data, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the stored result record, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path) as f:
+                entry: dict[str, Any] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry.get("result")
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """Store a result record. Written atomically, so readers never see partial entries."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key": key, "result": result}, f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def invalidate(self, key: str) -> None:
+        """Remove one entry."""
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _binary_fingerprint(self, binary: str) -> Optional[list[int]]:
+        """mtime and size of the tool binary, if it can be found on PATH."""
+        parts = binary.split()
+        resolved = shutil.which(parts[0]) if parts else None
+        if resolved is None:
+            return None
+        stat = os.stat(resolved)
+        return [stat.st_mtime_ns, stat.st_size]
@@ -0,0 +1,337 @@
+"""Concurrency limits shared by sync and async execution paths."""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from .models import Operation, Resources, ToolDescriptor
+
+
+class _Waiter:
+    def __init__(self, wake: Callable[[], None] = lambda: None):
+        self.wake = wake
+        self.granted = False
+
+
+async def _wait_async(
+    lock: threading.Lock,
+    waiter: _Waiter,
+    enqueue: Callable[[], bool],
+    abandon: Callable[[], None],
+) -> None:
+    """Wait on an event loop until waiter is granted.
+
+    enqueue() runs under lock and returns True if the request was granted
+    immediately. abandon() runs under lock when the wait is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[None] = loop.create_future()
+
+    def wake() -> None:
+        try:
+            loop.call_soon_threadsafe(_resolve, future)
+        except RuntimeError:
+            pass  # loop already closed
+
+    waiter.wake = wake
+    with lock:
+        if enqueue():
+            return
+
+    try:
+        await future
+    except asyncio.CancelledError:
+        with lock:
+            abandon()
+        raise
+
+
+class Slots:
+    """Counting semaphore usable from threads and event loops alike.
+
+    asyncio.Semaphore is bound to one loop and threading.Semaphore blocks the
+    loop; runs from execute() and execute_async() must share the same limit.
+    Waiters get slots in priority order, FIFO within a priority.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self._in_use = 0
+        # Heap of (-priority, arrival, waiter)
+        self._waiters: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def acquire(self, priority: int = 0) -> None:
+        """Block the calling thread until a slot is free."""
+        with self._lock:
+            if self._try_take_locked():
+                return
+            event = threading.Event()
+            self._push_locked(_Waiter(event.set), priority)
+        event.wait()
+
+    async def acquire_async(self, priority: int = 0) -> None:
+        """Wait without blocking the event loop until a slot is free."""
+        waiter = _Waiter()
+
+        def enqueue() -> bool:
+            if self._try_take_locked():
+                return True
+            self._push_locked(waiter, priority)
+            return False
+
+        def abandon() -> None:
+            if waiter.granted:
+                # Granted while being cancelled, hand the slot on
+                self._release_locked()
+            else:
+                self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+                heapq.heapify(self._waiters)
+
+        await _wait_async(self._lock, waiter, enqueue, abandon)
+
+    def release(self) -> None:
+        with self._lock:
+            self._release_locked()
+
+    @contextmanager
+    def hold(self, priority: int = 0) -> Iterator[None]:
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def hold_async(self, priority: int = 0) -> AsyncIterator[None]:
+        await self.acquire_async(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _push_locked(self, waiter: _Waiter, priority: int) -> None:
+        heapq.heappush(self._waiters, (-priority, next(self._seq), waiter))
+
+    def _try_take_locked(self) -> bool:
+        if not self._waiters and self._in_use < self.capacity:
+            self._in_use += 1
+            return True
+        return False
+
+    def _release_locked(self) -> None:
+        self._in_use -= 1
+        while self._waiters and self._in_use < self.capacity:
+            _, _, waiter = heapq.heappop(self._waiters)
+            waiter.granted = True
+            self._in_use += 1
+            waiter.wake()
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ExecutionSlots:
+    """Per-tool and per-operation limits derived from Operation.execution_mode.
+
+    Serial operations of a tool share one mutex, so they never overlap each
+    other. Each parallel operation gets its own slots, sized by
+    Operation.max_parallel or the default (CPU count). Parallel operations
+    declaring resources without a max_parallel of their own get no slots:
+    the ResourceScheduler limits them, and a slot queue in front of it would
+    hide waiting runs from its priority order and backfill.
+    """
+
+    def __init__(self, default_parallel: Optional[int] = None):
+        self.default_parallel = default_parallel or os.cpu_count() or 1
+        self._slots: dict[tuple[str, ...], Slots] = {}
+        self._lock = threading.Lock()
+
+    def for_operation(self, tool: ToolDescriptor, operation: Operation) -> Optional[Slots]:
+        if operation.execution_mode == "serial":
+            key: tuple[str, ...] = ("serial", tool.name)
+            capacity = 1
+        elif operation.resources is not None and operation.max_parallel is None:
+            return None
+        else:
+            key = ("parallel", tool.name, operation.name)
+            capacity = operation.max_parallel or self.default_parallel
+
+        with self._lock:
+            slots = self._slots.get(key)
+            if slots is None or slots.capacity != capacity:
+                # New or resized (descriptor changed); in-flight runs keep the old slots
+                slots = Slots(capacity)
+                self._slots[key] = slots
+            return slots
+
+
+class ResourceRequest(_Waiter):
+    """One run's claim on the scheduler, created by ResourceScheduler.request."""
+
+    def __init__(self, cpus: float, memory_mb: float, walltime: float, priority: int, seq: int):
+        super().__init__()
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.walltime = walltime
+        self.priority = priority
+        self.seq = seq
+        self.started = 0.0
+
+
+class ResourceScheduler:
+    """Bin-pack runs with declared resources onto the host's cores and memory.
+
+    Queued requests start in priority order (FIFO within a priority). When the
+    head of the queue does not fit, it gets a reservation at the earliest time
+    enough running work is expected to finish (start + walltime). Later
+    requests may backfill around it if they fit now and either finish before
+    that time or only use resources the reservation leaves over (EASY backfill).
+    """
+
+    def __init__(self, cpus: Optional[float] = None, memory_mb: Optional[float] = None):
+        self.total_cpus = float(cpus or os.cpu_count() or 1)
+        self.total_memory_mb = float(memory_mb or _physical_memory_mb())
+        self._free_cpus = self.total_cpus
+        self._free_memory_mb = self.total_memory_mb
+        self._running: list[ResourceRequest] = []
+        self._queue: list[ResourceRequest] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def request(self, resources: Resources, walltime: float, priority: int = 0) -> ResourceRequest:
+        """Build a request; demands larger than the host are clamped so they can run at all."""
+        return ResourceRequest(
+            cpus=min(float(resources.cpus), self.total_cpus),
+            memory_mb=min(float(resources.memory_mb or 0), self.total_memory_mb),
+            walltime=float(resources.walltime or walltime),
+            priority=priority,
+            seq=next(self._seq),
+        )
+
+    def acquire(self, request: ResourceRequest) -> None:
+        """Block the calling thread until the request has been started."""
+        event = threading.Event()
+        request.wake = event.set
+        with self._lock:
+            if self._enqueue_locked(request):
+                return
+        event.wait()
+
+    async def acquire_async(self, request: ResourceRequest) -> None:
+        """Wait without blocking the event loop until the request has been started."""
+
+        def abandon() -> None:
+            if request.granted:
+                self._release_locked(request)
+            else:
+                self._queue.remove(request)
+                self._dispatch_locked()
+
+        await _wait_async(
+            self._lock, request, lambda: self._enqueue_locked(request), abandon
+        )
+
+    def release(self, request: ResourceRequest) -> None:
+        with self._lock:
+            self._release_locked(request)
+
+    @contextmanager
+    def hold(self, request: ResourceRequest) -> Iterator[None]:
+        self.acquire(request)
+        try:
+            yield
+        finally:
+            self.release(request)
+
+    @asynccontextmanager
+    async def hold_async(self, request: ResourceRequest) -> AsyncIterator[None]:
+        await self.acquire_async(request)
+        try:
+            yield
+        finally:
+            self.release(request)
+
+    def _enqueue_locked(self, request: ResourceRequest) -> bool:
+        self._queue.append(request)
+        self._dispatch_locked(notify=request)
+        return request.granted
+
+    def _release_locked(self, request: ResourceRequest) -> None:
+        self._running.remove(request)
+        self._free_cpus += request.cpus
+        self._free_memory_mb += request.memory_mb
+        self._dispatch_locked()
+
+    def _fits(self, request: ResourceRequest, cpus: float, memory_mb: float) -> bool:
+        return request.cpus <= cpus + 1e-9 and request.memory_mb <= memory_mb + 1e-9
+
+    def _dispatch_locked(self, notify: Optional[ResourceRequest] = None) -> None:
+        """Start every queued request the policy allows.
+
+        notify is the request being enqueued by the caller itself; it learns
+        about its grant from the return value instead of a wake-up.
+        """
+        self._queue.sort(key=lambda r: (-r.priority, r.seq))
+        now = time.monotonic()
+        shadow: Optional[float] = None
+        extra_cpus = extra_memory_mb = 0.0
+
+        for request in list(self._queue):
+            if not self._fits(request, self._free_cpus, self._free_memory_mb):
+                if shadow is None:
+                    shadow, extra_cpus, extra_memory_mb = self._reserve(request, now)
+                continue
+            if shadow is not None:
+                # Backfill: must not delay the reservation of the blocked head
+                if now + request.walltime > shadow:
+                    if not self._fits(request, extra_cpus, extra_memory_mb):
+                        continue
+                    extra_cpus -= request.cpus
+                    extra_memory_mb -= request.memory_mb
+            self._start_locked(request, now, notify)
+
+    def _reserve(self, head: ResourceRequest, now: float) -> tuple[float, float, float]:
+        """Earliest time head fits, and the resources left over at that time."""
+        cpus, memory_mb = self._free_cpus, self._free_memory_mb
+        for running in sorted(self._running, key=lambda r: r.started + r.walltime):
+            cpus += running.cpus
+            memory_mb += running.memory_mb
+            if self._fits(head, cpus, memory_mb):
+                end = max(now, running.started + running.walltime)
+                return end, cpus - head.cpus, memory_mb - head.memory_mb
+        return float("inf"), 0.0, 0.0
+
+    def _start_locked(
+        self, request: ResourceRequest, now: float, notify: Optional[ResourceRequest]
+    ) -> None:
+        self._queue.remove(request)
+        self._running.append(request)
+        self._free_cpus -= request.cpus
+        self._free_memory_mb -= request.memory_mb
+        request.started = now
+        request.granted = True
+        if request is not notify:
+            request.wake()
+
+
+def _physical_memory_mb() -> float:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return float("inf")
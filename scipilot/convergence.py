@@ -0,0 +1,42 @@
+"""Stopping rules for outputs whose values converge while a run is going."""
+
+from __future__ import annotations
+import math
+from statistics import fmean, stdev
+from typing import Optional, Sequence
+
+from .models import StopRule
+
+
+def block_std_error(values: Sequence[float], blocks: int) -> Optional[float]:
+    """Standard error of the mean from the spread of block averages.
+
+    Consecutive samples of a simulation are correlated, so the naive standard
+    error underestimates the uncertainty; averages of long blocks are close
+    to independent. The oldest values that do not fill a block are dropped.
+    """
+    size = len(values) // blocks
+    if size == 0:
+        return None
+    start = len(values) - size * blocks
+    means = [fmean(values[start + i * size : start + (i + 1) * size]) for i in range(blocks)]
+    return stdev(means) / math.sqrt(blocks)
+
+
+def converged_value(rule: StopRule, values: Sequence[float]) -> Optional[float]:
+    """The converged estimate of a series, or None while the rule is not met.
+
+    std_error estimates the mean of the series, change its latest value.
+    """
+    if len(values) < rule.samples:
+        return None
+    if rule.criterion == "change":
+        window = values[-rule.samples :]
+        estimate, uncertainty = window[-1], max(window) - min(window)
+    else:
+        error = block_std_error(values, rule.blocks)
+        if error is None:
+            return None
+        estimate, uncertainty = fmean(values), error
+    tolerance = rule.tolerance * abs(estimate) if rule.relative else rule.tolerance
+    return estimate if uncertainty < tolerance else None
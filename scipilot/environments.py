@@ -0,0 +1,134 @@
+"""Activated conda environments captured once and reused for every run."""
+
+from __future__ import annotations
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .log import log
+from .models import EnvironmentConfig
+
+# Seconds allowed for one `conda activate`
+CAPTURE_TIMEOUT = 120.0
+
+# After a failed capture, runs fall back to per-run activation for this long
+RETRY_AFTER = 300.0
+
+# Printed before the variables, so output of profile scripts can be skipped
+_MARKER = b"__scipilot_env__"
+_DUMP_ENV = f'printf "\\0{_MARKER.decode()}\\0" && env -0'
+
+# Shell bookkeeping that should not leak from the capturing shell into runs
+_SHELL_VARS = frozenset({"PWD", "OLDPWD", "SHLVL", "_"})
+
+
+@dataclass(frozen=True)
+class EnvironmentSnapshot:
+    """Environment variables of an activated env and what they were captured from."""
+
+    variables: dict[str, str]
+    prefix: str
+    # mtime_ns of <prefix>/conda-meta; installing or removing packages changes it
+    meta_mtime_ns: int
+
+    @property
+    def fingerprint(self) -> list[object]:
+        return [self.prefix, self.meta_mtime_ns]
+
+
+class EnvironmentSnapshots:
+    """Capture each conda environment's activated variables once.
+
+    Activating conda takes seconds, often longer than a short operation
+    itself. A snapshot is captured the first time an environment is used and
+    reused until the environment's conda-meta directory changes. Other
+    environment types are cheap to activate and are not snapshotted.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: dict[tuple[str, str, Optional[str]], EnvironmentSnapshot] = {}
+        self._failed: dict[tuple[str, str, Optional[str]], float] = {}
+        self._locks: dict[tuple[str, str, Optional[str]], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, env: EnvironmentConfig) -> Optional[EnvironmentSnapshot]:
+        """Current snapshot of env, capturing it if needed; None to activate per run."""
+        if env.type != "conda" or env.python_path:
+            return None
+        key = (env.type, env.env_name, env.activate_script)
+        with self._lock:
+            env_lock = self._locks.setdefault(key, threading.Lock())
+
+        # One capture per environment at a time; others wait for its result
+        with env_lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and _meta_mtime_ns(snapshot.prefix) == snapshot.meta_mtime_ns:
+                return snapshot
+            if time.monotonic() - self._failed.get(key, -RETRY_AFTER) < RETRY_AFTER:
+                return None
+
+            try:
+                snapshot = capture(env)
+            except Exception as e:
+                log(f"Could not snapshot environment {env.env_name} ({e}), activating per run")
+                self._snapshots.pop(key, None)
+                self._failed[key] = time.monotonic()
+                return None
+            self._snapshots[key] = snapshot
+            self._failed.pop(key, None)
+            return snapshot
+
+    def clear(self) -> None:
+        """Forget all snapshots, e.g. after changing environments outside conda."""
+        with self._lock:
+            self._snapshots.clear()
+            self._failed.clear()
+
+
+def capture(env: EnvironmentConfig) -> EnvironmentSnapshot:
+    """Activate a conda environment in a throwaway shell and record its variables."""
+    if env.activate_script:
+        # Same activation the per-run wrapper does, then dump the result
+        command = [
+            "bash",
+            "-lc",
+            f'source "$1" && conda activate "$2" && {_DUMP_ENV}',
+            "bash",
+            env.activate_script,
+            env.env_name,
+        ]
+    else:
+        command = ["conda", "run", "-n", env.env_name, "sh", "-c", _DUMP_ENV]
+
+    result = subprocess.run(command, capture_output=True, timeout=CAPTURE_TIMEOUT)
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(message or f"exit code {result.returncode}")
+
+    _, marker, dump = result.stdout.partition(b"\0" + _MARKER + b"\0")
+    if not marker:
+        raise RuntimeError("activation did not print the environment")
+    variables = {}
+    for entry in dump.split(b"\0"):
+        name, sep, value = entry.decode(errors="surrogateescape").partition("=")
+        if sep and name.isidentifier() and name not in _SHELL_VARS:
+            variables[name] = value
+
+    prefix = variables.get("CONDA_PREFIX")
+    if not prefix:
+        raise RuntimeError("CONDA_PREFIX not set after activation")
+    meta_mtime_ns = _meta_mtime_ns(prefix)
+    if meta_mtime_ns is None:
+        raise RuntimeError(f"{prefix}/conda-meta not found")
+    return EnvironmentSnapshot(variables, prefix, meta_mtime_ns)
+
+
+def _meta_mtime_ns(prefix: str) -> Optional[int]:
+    try:
+        return os.stat(Path(prefix) / "conda-meta").st_mtime_ns
+    except OSError:
+        return None
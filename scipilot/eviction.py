@@ -0,0 +1,203 @@
+"""Size- and age-bounded eviction of run directories."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal, Optional, Union
+
+from .cache import ResultCache
+from .log import log
+from .processes import run_processes
+from .runs import (
+    dir_size,
+    iter_run_dirs,
+    owner_gone,
+    read_run_meta,
+    remove_empty_shards,
+    update_run_meta,
+)
+
+EvictionPolicy = Literal["lru", "lfu"]
+
+# Seconds after which a run still recorded as running is taken as abandoned
+STALE_RUNNING_AFTER = 7 * 24 * 3600.0
+
+
+@dataclass
+class RunInfo:
+    """Disk usage and access statistics of one run directory."""
+
+    path: Path
+    tool: str
+    size: int
+    last_access: float
+    hits: int
+    pinned: bool
+    running: bool
+
+
+class EvictionManager:
+    """Delete old or excess run directories to stay within disk limits.
+
+    Limits are applied in order: maximum age, per-tool quotas, then the total
+    budget. Within a limit, runs are evicted least-recently (lru) or
+    least-frequently (lfu) used first. Pinned and still-running runs are never
+    evicted. Result cache entries pointing at evicted runs are dropped too.
+
+    A run recorded as running whose server process on this host is gone, or
+    that started more than stale_after seconds ago, was abandoned by a crash
+    and is evictable like a finished one, once none of its processes are
+    left (the OrphanReaper stops those).
+    """
+
+    def __init__(
+        self,
+        base_dir: Union[Path, str],
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        policy: EvictionPolicy = "lru",
+        tool_quotas: Optional[dict[str, int]] = None,
+        cache: Optional[ResultCache] = None,
+        stale_after: Optional[float] = STALE_RUNNING_AFTER,
+    ):
+        self.base_dir = Path(base_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.policy = policy
+        self.tool_quotas = tool_quotas or {}
+        self.cache = cache
+        self.stale_after = stale_after
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def sweep(self) -> list[Path]:
+        """Run one eviction pass and return the removed run directories."""
+        with self._lock:
+            all_runs = self.scan()
+            # Pinned and running dirs still take space, so they count toward the total
+            used_total = sum(info.size for info in all_runs)
+            runs = [info for info in all_runs if not info.pinned and not info.running]
+            evicted: list[Path] = []
+
+            def evict(info: RunInfo) -> None:
+                nonlocal used_total
+                shutil.rmtree(info.path, ignore_errors=True)
+                remove_empty_shards(info.path, self.base_dir)
+                evicted.append(info.path)
+                runs.remove(info)
+                used_total -= info.size
+
+            if self.max_age is not None:
+                cutoff = time.time() - self.max_age
+                for info in [r for r in runs if r.last_access < cutoff]:
+                    evict(info)
+
+            for tool, quota in self.tool_quotas.items():
+                gone = set(evicted)
+                used = sum(r.size for r in all_runs if r.tool == tool and r.path not in gone)
+                for info in self._order([r for r in runs if r.tool == tool]):
+                    if used <= quota:
+                        break
+                    used -= info.size
+                    evict(info)
+
+            if self.max_bytes is not None:
+                for info in self._order(runs):
+                    if used_total <= self.max_bytes:
+                        break
+                    evict(info)
+
+            if evicted and self.cache is not None:
+                self._drop_cache_entries(evicted)
+            return evicted
+
+    def scan(self) -> list[RunInfo]:
+        """Collect size and access statistics for every run directory."""
+        runs = []
+        now = time.time()
+        # Run directories processes still write to
+        active = set(run_processes())
+        for run_dir in iter_run_dirs(self.base_dir):
+            meta = read_run_meta(run_dir)
+            try:
+                mtime = run_dir.stat().st_mtime
+            except OSError:
+                continue
+            # Kept while its server lives or its processes still write to it
+            running = self._still_running(meta, mtime, now) or os.path.abspath(run_dir) in active
+            runs.append(
+                RunInfo(
+                    path=run_dir,
+                    tool=meta.get("tool", ""),
+                    size=dir_size(run_dir),
+                    last_access=meta.get("last_access", meta.get("created_at", mtime)),
+                    hits=meta.get("hits", 0),
+                    pinned=meta.get("pinned", False),
+                    running=running,
+                )
+            )
+        return runs
+
+    def pin(self, run_dir: Union[Path, str], pinned: bool = True) -> None:
+        """Mark a run as important so it is never evicted (or clear the mark)."""
+        update_run_meta(run_dir, pinned=pinned)
+
+    def start(self, interval: float = 600.0) -> None:
+        """Sweep periodically in a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name="scipilot-eviction", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sweeper."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    log(f"Evicted {len(evicted)} run directories")
+            except Exception as e:
+                log(f"Eviction sweep failed: {e}")
+
+    def _still_running(self, meta: dict[str, Any], mtime: float, now: float) -> bool:
+        """Whether a run is running and not abandoned by a server that died."""
+        if meta.get("status") != "running":
+            return False
+        if self.stale_after is not None and meta.get("created_at", mtime) < now - self.stale_after:
+            return False
+        return not owner_gone(meta)
+
+    def _order(self, runs: list[RunInfo]) -> list[RunInfo]:
+        """Sort runs so the first ones are evicted first."""
+        if self.policy == "lfu":
+            return sorted(runs, key=lambda r: (r.hits, r.last_access))
+        return sorted(runs, key=lambda r: r.last_access)
+
+    def _drop_cache_entries(self, evicted: list[Path]) -> None:
+        assert self.cache is not None
+        gone = {str(path) for path in evicted}
+        for entry in self.cache.cache_dir.glob("*/*.json"):
+            try:
+                with open(entry) as f:
+                    run_id = json.load(f).get("result", {}).get("run_id")
+            except (OSError, json.JSONDecodeError):
+                continue
+            if run_id in gone:
+                entry.unlink(missing_ok=True)
+
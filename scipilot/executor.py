@@ -1,33 +1,102 @@
 """Execute tools and parse outputs."""
 
 from __future__ import annotations
+import asyncio
+import json
+import mmap
+import os
 import re
+import shlex
 import subprocess
-from datetime import datetime
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
 from pathlib import Path
-from typing import Any, Optional, Union
-
-from .models import EnvironmentConfig, Operation, OutputSpec, ToolDescriptor
+from typing import Any, Callable, Iterator, Optional, Union
+
+from .cache import ResultCache
+from .concurrency import ExecutionSlots, ResourceScheduler
+from .environments import EnvironmentSnapshot, EnvironmentSnapshots
+from .models import EnvironmentConfig, Operation, ToolDescriptor
+from .plan import OutputPlan, get_plan
+from .processes import (
+    KILL_GRACE_PERIOD,
+    reap_group,
+    run_environment,
+    terminate_group,
+    terminate_group_async,
+)
+from .progress import PROGRESS_INTERVAL, ProgressCallback, ProgressMonitor, StopCallback
+from .run_index import RunIndex
+from .runs import (
+    RunLogs,
+    log_paths,
+    new_run_id,
+    read_log,
+    read_tail,
+    record_access,
+    run_dir_for,
+    run_owner,
+    update_run_meta,
+    write_run_meta,
+)
+from .workers import Worker, WorkerPool, WorkerPools, split_python_argv
+
+
+# Characters returned for outputs of type text
+TEXT_OUTPUT_LIMIT = 10000
+
+# First block scanned by search_from: end; grows 4x per step
+TAIL_BLOCK_SIZE = 64 * 1024
 
 
 class ExecutionResult:
-    """Result of a tool execution."""
+    """Result of a tool execution.
+
+    stdout and stderr are spooled to log files in the run directory and only
+    read when accessed. Explicit stdout/stderr strings (e.g. timeout messages)
+    take precedence over the logs.
+    """
 
     def __init__(
         self,
         success: bool,
-        stdout: str = "",
-        stderr: str = "",
+        stdout: Optional[str] = None,
+        stderr: Optional[str] = None,
         return_code: int = 0,
         outputs: Optional[dict[str, Any]] = None,
         run_id: str = "",
+        cached: bool = False,
+        stdout_path: Optional[Path] = None,
+        stderr_path: Optional[Path] = None,
+        converged: bool = False,
     ):
         self.success = success
-        self.stdout = stdout
-        self.stderr = stderr
+        self._stdout = stdout
+        self._stderr = stderr
         self.return_code = return_code
         self.outputs = outputs or {}
         self.run_id = run_id
+        self.cached = cached
+        self.stdout_path = stdout_path
+        self.stderr_path = stderr_path
+        # Stopped early because its outputs' stop rules were met
+        self.converged = converged
+
+    @property
+    def stdout(self) -> str:
+        """Full stdout. Reads the log on every access, nothing is kept in memory."""
+        return self._stdout if self._stdout is not None else read_log(self.stdout_path)
+
+    @property
+    def stderr(self) -> str:
+        """Full stderr. Reads the log on every access, nothing is kept in memory."""
+        return self._stderr if self._stderr is not None else read_log(self.stderr_path)
+
+    def stderr_tail(self, max_chars: int = 500) -> str:
+        """End of stderr, where tools usually report what went wrong."""
+        if self._stderr is not None:
+            return self._stderr[-max_chars:]
+        return read_tail(self.stderr_path, max_chars)[-max_chars:]
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -35,63 +104,531 @@ class ExecutionResult:
             "return_code": self.return_code,
             "outputs": self.outputs,
             "run_id": self.run_id,
-            "stderr_preview": self.stderr[:500] if self.stderr else None,
+            "stderr_preview": self.stderr_tail() or None,
+            "cached": self.cached,
+            "converged": self.converged,
+        }
+
+    def to_record(self) -> dict[str, Any]:
+        """Serializable form, used by the result cache. Logs are referenced, not copied."""
+        return {
+            "success": self.success,
+            "stdout": self._stdout,
+            "stderr": self._stderr,
+            "return_code": self.return_code,
+            "outputs": self.outputs,
+            "run_id": self.run_id,
+            "stdout_path": str(self.stdout_path) if self.stdout_path else None,
+            "stderr_path": str(self.stderr_path) if self.stderr_path else None,
+            "converged": self.converged,
         }
 
+    @classmethod
+    def from_record(cls, record: dict[str, Any], cached: bool = False) -> ExecutionResult:
+        stdout_path = record.get("stdout_path")
+        stderr_path = record.get("stderr_path")
+        return cls(
+            success=record["success"],
+            stdout=record.get("stdout"),
+            stderr=record.get("stderr"),
+            return_code=record.get("return_code", 0),
+            outputs=record.get("outputs"),
+            run_id=record.get("run_id", ""),
+            cached=cached,
+            stdout_path=Path(stdout_path) if stdout_path else None,
+            stderr_path=Path(stderr_path) if stderr_path else None,
+            converged=record.get("converged", False),
+        )
+
 
 class ToolExecutor:
     """Execute tools based on descriptors."""
 
-    def __init__(self, base_working_dir: Union[Path, str] = "./runs"):
+    # Seconds between progress reports of runs awaited with a progress callback
+    progress_interval = PROGRESS_INTERVAL
+
+    def __init__(
+        self,
+        base_working_dir: Union[Path, str] = "./runs",
+        cache: Optional[ResultCache] = None,
+        max_parallel: Optional[int] = None,
+        cpus: Optional[float] = None,
+        memory_mb: Optional[float] = None,
+        run_index: Optional[RunIndex] = None,
+        env_snapshots: bool = True,
+        kill_grace: float = KILL_GRACE_PERIOD,
+    ):
+        """env_snapshots: run conda tools with a captured activated environment
+        instead of activating conda for every run. kill_grace: seconds a run's
+        processes get between SIGTERM and SIGKILL when it is stopped."""
         self.base_working_dir = Path(base_working_dir)
         self.base_working_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = cache
+        self.run_index = run_index
+        self.slots = ExecutionSlots(max_parallel)
+        self.scheduler = ResourceScheduler(cpus, memory_mb)
+        self.environments = EnvironmentSnapshots() if env_snapshots else None
+        self.workers = WorkerPools()
+        self.kill_grace = kill_grace
 
     def execute(
-        self, tool: ToolDescriptor, operation: Operation, inputs: dict[str, Any]
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        priority: int = 0,
     ) -> ExecutionResult:
-        """Execute a single operation."""
-        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        working_dir = self.base_working_dir / f"{tool.name}_{operation.name}_{run_id}"
-        working_dir.mkdir(parents=True, exist_ok=True)
+        """Execute a single operation, or return the cached result of an identical run.
+
+        Operations declaring resources wait for the scheduler. Waiting runs,
+        for a slot or for resources, start in priority order.
+        """
+        cache_key = self._cache_key(tool, operation, inputs)
+        if cache_key is not None:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                return cached
+
+        slots = self.slots.for_operation(tool, operation)
+        with slots.hold(priority) if slots is not None else nullcontext():
+            if operation.resources is None:
+                result = self._execute(tool, operation, inputs)
+            else:
+                request = self.scheduler.request(
+                    operation.resources, operation.timeout, priority
+                )
+                with self.scheduler.hold(request):
+                    result = self._execute(tool, operation, inputs)
+        self._finish_run(result)
+        self._cache_store(cache_key, result)
+        return result
 
-        # Build command
-        command = self._build_command(tool, operation, inputs, working_dir, run_id)
+    def _execute(
+        self, tool: ToolDescriptor, operation: Operation, inputs: dict[str, Any]
+    ) -> ExecutionResult:
+        working_dir, command, env = self._prepare_run(tool, operation, inputs)
+        logs = log_paths(working_dir)
+        stdout_path, stderr_path = logs
 
         # Execute
         try:
             # SECURITY: shell=True with command built from tool YAML + user inputs.
             # Tool descriptors are trusted code. Only load descriptors you wrote/reviewed.
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=operation.timeout,
-            )
+            # argv_template operations run without a shell.
+            # Output goes straight to the log files, never through this process.
+            # Each run gets its own process group, so stopping it reaches every
+            # process it started.
+            target = self._worker_target(tool, command, env)
+            if target is not None:
+                pool, argv = target
+                return_code = pool.run(
+                    argv, working_dir, stdout_path, stderr_path, operation.timeout
+                )
+            else:
+                with open(stdout_path, "wb") as out, open(stderr_path, "wb") as err:
+                    process = subprocess.Popen(
+                        command,
+                        shell=isinstance(command, str),
+                        cwd=working_dir,
+                        env=run_environment(env, working_dir),
+                        stdout=out,
+                        stderr=err,
+                        start_new_session=True,
+                    )
+                try:
+                    return_code = process.wait(timeout=operation.timeout)
+                except BaseException:
+                    terminate_group(process, self.kill_grace)
+                    raise
+                reap_group(process.pid, self.kill_grace)
 
             # Parse outputs
-            outputs = self._parse_outputs(operation, working_dir, result.stdout, result.stderr)
+            outputs = self._parse_outputs(operation, working_dir, stdout_path)
 
             return ExecutionResult(
-                success=result.returncode == 0,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                return_code=result.returncode,
+                success=return_code == 0,
+                return_code=return_code,
                 outputs=outputs,
                 run_id=str(working_dir),
+                stdout_path=logs.stdout_path,
+                stderr_path=logs.stderr_path,
             )
 
         except subprocess.TimeoutExpired:
-            return ExecutionResult(
-                success=False,
-                stderr=f"Timeout after {operation.timeout} seconds",
-                return_code=-1,
-                run_id=str(working_dir),
+            return self._failure(f"Timeout after {operation.timeout} seconds", working_dir, logs)
+        except Exception as e:
+            return self._failure(str(e), working_dir, logs)
+
+    async def execute_async(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        priority: int = 0,
+        progress: Optional[ProgressCallback] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> ExecutionResult:
+        """Execute a single operation without blocking the event loop.
+
+        Many runs can be awaited concurrently. If the awaiting task is cancelled,
+        the child process is killed before the cancellation propagates. progress,
+        if given, receives the run's progress and latest output values while it
+        runs (see ProgressMonitor). Runs of operations with stop rules are
+        stopped once their outputs converge; execute() always runs to the end.
+        on_start is called once the run got its slot and resources and starts;
+        not at all for cached results.
+        """
+        # Hashing file inputs does blocking I/O
+        cache_key = await asyncio.to_thread(self._cache_key, tool, operation, inputs)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self._cache_lookup, cache_key)
+            if cached is not None:
+                return cached
+
+        if cache_key is None:
+            # Capturing an environment the first time blocks for seconds
+            await asyncio.to_thread(self._environment, tool)
+
+        slots = self.slots.for_operation(tool, operation)
+        async with slots.hold_async(priority) if slots is not None else nullcontext():
+            if operation.resources is None:
+                result = await self._execute_async(tool, operation, inputs, progress, on_start)
+            else:
+                request = self.scheduler.request(
+                    operation.resources, operation.timeout, priority
+                )
+                async with self.scheduler.hold_async(request):
+                    result = await self._execute_async(
+                        tool, operation, inputs, progress, on_start
+                    )
+        await asyncio.to_thread(self._finish_run, result)
+        await asyncio.to_thread(self._cache_store, cache_key, result)
+        return result
+
+    async def _execute_async(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> ExecutionResult:
+        if on_start is not None:
+            on_start()
+        # Creates the run directory and writes its metadata and index entry
+        working_dir, command, env = await asyncio.to_thread(
+            self._prepare_run, tool, operation, inputs
+        )
+        logs = log_paths(working_dir)
+        stdout_path, stderr_path = logs
+
+        resolved = {spec.name: inputs.get(spec.name, spec.default) for spec in operation.inputs}
+        candidate = ProgressMonitor(get_plan(operation), working_dir, stdout_path, resolved)
+        # Only worth polling if a stop rule can end the run or someone listens
+        monitor: Optional[ProgressMonitor] = (
+            candidate if candidate.stops or (progress is not None and candidate.active) else None
+        )
+        return await self._run_async(
+            tool, operation, command, env, working_dir, logs, monitor, progress
+        )
+
+    async def _run_async(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        command: Union[str, list[str]],
+        env: Optional[dict[str, str]],
+        working_dir: Path,
+        logs: RunLogs,
+        monitor: Optional[ProgressMonitor] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> ExecutionResult:
+        """Run a prepared command in a process or worker and collect its outputs.
+
+        monitor, if given, follows the run's output while it goes: it reports
+        to progress and stops the run once the outputs' stop rules are met.
+        """
+        stdout_path, stderr_path = logs
+        # Estimates of a run stopped at convergence
+        converged: Optional[dict[str, float]] = None
+        target = self._worker_target(tool, command, env)
+        if target is not None:
+            pool, argv = target
+            workers: list[Worker] = []
+
+            async def stop_worker(estimates: dict[str, float]) -> None:
+                nonlocal converged
+                converged = estimates
+                # The worker is mid-call; stopping the run means replacing it
+                for worker in workers:
+                    await asyncio.to_thread(worker.kill)
+
+            watch = self._watch(monitor, progress, stop_worker)
+            try:
+                return_code = await asyncio.to_thread(
+                    pool.run,
+                    argv,
+                    working_dir,
+                    stdout_path,
+                    stderr_path,
+                    operation.timeout,
+                    workers.append,
+                )
+            except subprocess.TimeoutExpired:
+                return self._failure(
+                    f"Timeout after {operation.timeout} seconds", working_dir, logs
+                )
+            except asyncio.CancelledError:
+                # The worker is mid-call; it cannot be interrupted, only replaced
+                for worker in workers:
+                    await asyncio.to_thread(worker.kill)
+                await asyncio.to_thread(self._record_outcome, working_dir, "cancelled", None, None)
+                raise
+            except Exception as e:
+                if converged is None:
+                    return self._failure(str(e), working_dir, logs)
+                return_code = await asyncio.to_thread(workers[0].process.wait)
+            finally:
+                if watch is not None:
+                    watch.cancel()
+            return await self._collect_outputs(operation, working_dir, return_code, logs, converged)
+
+        try:
+            # SECURITY: same trust model as execute() - the command is run by the shell.
+            with open(stdout_path, "wb") as out, open(stderr_path, "wb") as err:
+                run_env = run_environment(env, working_dir)
+                if isinstance(command, str):
+                    process = await asyncio.create_subprocess_shell(
+                        command,
+                        cwd=working_dir,
+                        env=run_env,
+                        stdout=out,
+                        stderr=err,
+                        start_new_session=True,
+                    )
+                else:
+                    process = await asyncio.create_subprocess_exec(
+                        *command,
+                        cwd=working_dir,
+                        env=run_env,
+                        stdout=out,
+                        stderr=err,
+                        start_new_session=True,
+                    )
+        except Exception as e:
+            return self._failure(str(e), working_dir, logs)
+
+        async def stop_process(estimates: dict[str, float]) -> None:
+            nonlocal converged
+            converged = estimates
+            await terminate_group_async(process, self.kill_grace)
+
+        watch = self._watch(monitor, progress, stop_process)
+        try:
+            return_code = await asyncio.wait_for(process.wait(), timeout=operation.timeout)
+        except asyncio.TimeoutError:
+            await terminate_group_async(process, self.kill_grace)
+            return self._failure(f"Timeout after {operation.timeout} seconds", working_dir, logs)
+        except asyncio.CancelledError:
+            await terminate_group_async(process, self.kill_grace)
+            await asyncio.to_thread(self._record_outcome, working_dir, "cancelled", None, None)
+            raise
+        finally:
+            if watch is not None:
+                watch.cancel()
+
+        await asyncio.to_thread(reap_group, process.pid, self.kill_grace)
+        return await self._collect_outputs(operation, working_dir, return_code, logs, converged)
+
+    @staticmethod
+    def _failure(message: str, working_dir: Path, logs: RunLogs) -> ExecutionResult:
+        """Result of a run that failed before producing outputs."""
+        return ExecutionResult(
+            success=False,
+            stderr=message,
+            return_code=-1,
+            run_id=str(working_dir),
+            stdout_path=logs.stdout_path,
+            stderr_path=logs.stderr_path,
+        )
+
+    def _watch(
+        self,
+        monitor: Optional[ProgressMonitor],
+        progress: Optional[ProgressCallback],
+        stop: StopCallback,
+    ) -> Optional[asyncio.Task[None]]:
+        """Start following a running command's output, if a monitor is given."""
+        if monitor is None:
+            return None
+        on_converged = stop if monitor.stops else None
+        return asyncio.create_task(monitor.run(progress, self.progress_interval, on_converged))
+
+    async def _collect_outputs(
+        self,
+        operation: Operation,
+        working_dir: Path,
+        return_code: int,
+        logs: RunLogs,
+        converged: Optional[dict[str, float]] = None,
+    ) -> ExecutionResult:
+        """Parse a finished run's outputs.
+
+        converged holds the estimates of a run stopped at convergence; they
+        replace the parsed values of their outputs, and the run succeeds.
+        """
+        stdout_path = logs.stdout_path
+        try:
+            # Output files can be large, keep parsing off the event loop
+            outputs = await asyncio.to_thread(
+                self._parse_outputs, operation, working_dir, stdout_path
             )
         except Exception as e:
-            return ExecutionResult(
-                success=False, stderr=str(e), return_code=-1, run_id=str(working_dir)
+            return self._failure(str(e), working_dir, logs)
+
+        if converged is not None:
+            outputs.update(converged)
+
+        return ExecutionResult(
+            success=return_code == 0 or converged is not None,
+            return_code=return_code,
+            outputs=outputs,
+            run_id=str(working_dir),
+            converged=converged is not None,
+            stdout_path=logs.stdout_path,
+            stderr_path=logs.stderr_path,
+        )
+
+    def _worker_target(
+        self,
+        tool: ToolDescriptor,
+        command: Union[str, list[str]],
+        env: Optional[dict[str, str]],
+    ) -> Optional[tuple[WorkerPool, list[str]]]:
+        """Worker pool and script argv for a persistent tool's run, if a worker can take it."""
+        if not tool.tool.persistent or not isinstance(command, list):
+            return None
+        split = split_python_argv(command)
+        if split is None:
+            return None  # not a plain python call, e.g. conda activation without a snapshot
+        python, argv = split
+        return self.workers.get(python, env, tool.tool.worker), argv
+
+    def _cache_key(
+        self, tool: ToolDescriptor, operation: Operation, inputs: dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key for a run, or None if caching does not apply."""
+        if self.cache is None or not operation.cacheable:
+            return None
+        # Placeholders keep the key independent of where and when the run happens
+        if get_plan(operation).argv is None:
+            command = self._build_command(
+                tool, operation, inputs, Path("{working_dir}"), "{run_id}"
+            )
+        else:
+            command = json.dumps(
+                self._build_argv(tool, operation, inputs, Path("{working_dir}"), "{run_id}")
+            )
+        snapshot = self._environment(tool)
+        return self.cache.make_key(
+            tool, operation, inputs, command, snapshot.fingerprint if snapshot else None
+        )
+
+    def _environment(self, tool: ToolDescriptor) -> Optional[EnvironmentSnapshot]:
+        """Snapshot of the tool's activated environment, if it is run from one."""
+        if self.environments is None or tool.tool.environment is None:
+            return None
+        return self.environments.get(tool.tool.environment)
+
+    def _cache_lookup(self, key: str) -> Optional[ExecutionResult]:
+        assert self.cache is not None
+        record = self.cache.get(key)
+        if record is None:
+            return None
+        if Path(record.get("run_id", "")).is_dir():
+            record_access(record["run_id"])
+        return ExecutionResult.from_record(record, cached=True)
+
+    def _cache_store(self, key: Optional[str], result: ExecutionResult) -> None:
+        # Only successful runs are memoized; failures may be transient
+        if key is None or self.cache is None or not result.success:
+            return
+        self.cache.put(key, result.to_record())
+
+    def _prepare_run(
+        self, tool: ToolDescriptor, operation: Operation, inputs: dict[str, Any]
+    ) -> tuple[Path, Union[str, list[str]], Optional[dict[str, str]]]:
+        """Create the working directory for a run and render its command.
+
+        The command is a shell command line, or an argument vector for
+        argv_template operations. Also returns the environment variables to
+        run it with (None: inherit).
+        """
+        run_id = new_run_id()
+        working_dir = run_dir_for(self.base_working_dir, tool.name, operation.name, run_id)
+        working_dir.mkdir(parents=True)
+
+        resolved_inputs = {
+            spec.name: inputs.get(spec.name, spec.default) for spec in operation.inputs
+        }
+        started_at = time.time()
+        write_run_meta(
+            working_dir,
+            {
+                "tool": tool.name,
+                "operation": operation.name,
+                "run_id": run_id,
+                "status": "running",
+                "created_at": started_at,
+                "inputs": resolved_inputs,
+                # Tells a live run from one whose server died
+                **run_owner(),
+            },
+        )
+        if self.run_index is not None:
+            self.run_index.record_start(
+                run_id, tool.name, operation.name, resolved_inputs, working_dir, started_at
+            )
+
+        snapshot = self._environment(tool)
+        env = snapshot.variables if snapshot else None
+        command: Union[str, list[str]]
+        if get_plan(operation).argv is None:
+            command = self._build_command(
+                tool, operation, inputs, working_dir, run_id, activate=snapshot is None
+            )
+        else:
+            command, extra_env = self._build_argv(
+                tool, operation, inputs, working_dir, run_id, activate=snapshot is None
+            )
+            if extra_env:
+                env = {**(env or os.environ), **extra_env}
+        return working_dir, command, env
+
+    def _finish_run(self, result: ExecutionResult) -> None:
+        if result.run_id:
+            self._record_outcome(
+                Path(result.run_id),
+                "succeeded" if result.success else "failed",
+                result.return_code,
+                result.outputs,
+            )
+
+    def _record_outcome(
+        self,
+        working_dir: Path,
+        status: str,
+        return_code: Optional[int],
+        outputs: Optional[dict[str, Any]],
+    ) -> None:
+        """Record how a run ended in its metadata and the run index."""
+        finished_at = time.time()
+        meta = update_run_meta(
+            working_dir, status=status, return_code=return_code, finished_at=finished_at
+        )
+        if self.run_index is not None and "run_id" in meta:
+            self.run_index.record_finish(
+                meta["run_id"], status, return_code, outputs, finished_at
             )
 
     def _build_command(
@@ -101,8 +638,15 @@ class ToolExecutor:
         inputs: dict[str, Any],
         working_dir: Path,
         run_id: str,
+        activate: bool = True,
     ) -> str:
-        """Build command from template and inputs."""
+        """Build command from the operation's precompiled templates and inputs.
+
+        activate=False leaves out environment activation, for runs started
+        with a snapshot of the activated environment.
+        """
+        plan = get_plan(operation)
+
         # Prepare template variables
         template_vars = {
             "working_dir": str(working_dir),
@@ -113,27 +657,98 @@ class ToolExecutor:
         template_vars["binary"] = tool.tool.binary
 
         # Add inputs with their arg_templates
-        for input_spec in operation.inputs:
+        for input_plan in plan.inputs:
+            input_spec = input_plan.spec
             value = inputs.get(input_spec.name)
             if value is None:
                 value = input_spec.default
 
             if value is not None:
                 # Format according to arg_template
-                formatted = input_spec.arg_template.format(value=value)
-                template_vars[input_spec.name] = formatted
+                template_vars[input_spec.name] = input_plan.arg.render({"value": value})
             else:
                 template_vars[input_spec.name] = ""
 
         # Build base command
-        command = operation.command_template.format(**template_vars)
+        assert plan.command is not None, "argv_template operations use _build_argv"
+        command = plan.command.render(template_vars)
 
         # Wrap with environment if configured
-        if tool.tool.environment:
+        if tool.tool.environment and activate:
             command = self._wrap_with_environment(command, tool.tool.environment)
 
         return command
 
+    def _build_argv(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        working_dir: Path,
+        run_id: str,
+        activate: bool = True,
+    ) -> tuple[list[str], dict[str, str]]:
+        """Build the argument vector of an argv_template operation.
+
+        Also returns variables to add to the environment (venv, pyenv).
+        Values are substituted per argument and never re-parsed by a shell.
+        """
+        plan = get_plan(operation)
+        assert plan.argv is not None
+
+        # Input values as argument words, and joined for use inside a larger argument
+        words: dict[str, list[str]] = {"binary": shlex.split(tool.tool.binary)}
+        for input_plan in plan.inputs:
+            input_spec = input_plan.spec
+            value = inputs.get(input_spec.name)
+            if value is None:
+                value = input_spec.default
+            words[input_spec.name] = (
+                [word.render({"value": value}) for word in input_plan.arg_words]
+                if value is not None
+                else []
+            )
+        template_vars = {name: " ".join(value) for name, value in words.items()}
+        template_vars["working_dir"] = str(working_dir)
+        template_vars["run_id"] = run_id
+
+        argv: list[str] = []
+        for arg in plan.argv:
+            field = arg.sole_field
+            if field in words:
+                argv.extend(words[field])
+            else:
+                argv.append(arg.render(template_vars))
+
+        if tool.tool.environment and activate:
+            return self._wrap_argv(argv, tool.tool.environment)
+        return argv, {}
+
+    def _wrap_argv(
+        self, argv: list[str], env: EnvironmentConfig
+    ) -> tuple[list[str], dict[str, str]]:
+        """argv counterpart of _wrap_with_environment."""
+        if env.python_path:
+            return [env.python_path if arg == "python" else arg for arg in argv], {}
+
+        if env.type == "conda":
+            if env.activate_script:
+                # Arguments pass through "$@" untouched
+                script = 'source "$1" && conda activate "$2" && shift 2 && exec "$@"'
+                return ["bash", "-lc", script, "bash", env.activate_script, env.env_name, *argv], {}
+            return ["conda", "run", "-n", env.env_name, "--no-capture-output", *argv], {}
+
+        elif env.type == "venv":
+            # What bin/activate does, without a shell
+            venv = os.path.abspath(env.env_name)
+            path = f"{venv}/bin{os.pathsep}{os.environ.get('PATH', '')}"
+            return argv, {"VIRTUAL_ENV": venv, "PATH": path}
+
+        elif env.type == "pyenv":
+            return argv, {"PYENV_VERSION": env.env_name}
+
+        return argv, {}
+
     def _wrap_with_environment(self, command: str, env: EnvironmentConfig) -> str:
         """Wrap command with conda/venv activation."""
         if env.python_path:
@@ -166,71 +781,188 @@ class ToolExecutor:
         return command
 
     def _parse_outputs(
-        self, operation: Operation, working_dir: Path, stdout: str, stderr: str
+        self, operation: Operation, working_dir: Path, stdout_path: Path
     ) -> dict[str, Any]:
-        """Extract outputs according to specs."""
+        """Extract outputs according to specs.
+
+        Specs sharing a file (or glob) resolve, map and decode it only once.
+        """
         outputs = {}
 
-        for spec in operation.outputs:
-            try:
-                value = self._extract_output(spec, working_dir, stdout, stderr)
-                outputs[spec.name] = value
-            except Exception as e:
-                outputs[spec.name] = f"<extraction error: {e}>"
+        with _RunFiles(working_dir, stdout_path) as files:
+            for output_plan in get_plan(operation).outputs:
+                name = output_plan.spec.name
+                try:
+                    value = self._extract_output(output_plan, files)
+                    outputs[name] = value
+                except Exception as e:
+                    outputs[name] = f"<extraction error: {e}>"
 
         return outputs
 
-    def _extract_output(self, spec: OutputSpec, working_dir: Path, stdout: str, stderr: str) -> Any:
+    def _extract_output(self, output_plan: OutputPlan, files: _RunFiles) -> Any:
         """Extract single output value."""
-        # Resolve path (may contain wildcards)
-        path_pattern = spec.path.format(working_dir=str(working_dir))
-
-        if "*" in path_pattern:
-            import glob
-
-            files = glob.glob(path_pattern)
-            if not files:
-                return None
-            content_path = Path(files[0])
-        else:
-            content_path = Path(path_pattern)
-
-        # Read content
-        if content_path.exists():
-            content = content_path.read_text()
-        else:
-            # Try stdout if file not found
-            content = stdout
+        spec = output_plan.spec
+        content_path = files.resolve(output_plan)
+        if content_path is None:
+            return None
 
         # Extract based on type
         if spec.type == "text":
-            return content[:10000]  # Limit size
-
-        elif spec.type == "float" and spec.extract_pattern:
-            match = re.search(spec.extract_pattern, content)
-            if match:
-                return float(match.group(1))
-            return None
-
-        elif spec.type == "integer" and spec.extract_pattern:
-            match = re.search(spec.extract_pattern, content)
-            if match:
-                return int(match.group(1))
-            return None
+            if spec.search_from == "end":
+                return read_tail(content_path, 4 * TEXT_OUTPUT_LIMIT)[-TEXT_OUTPUT_LIMIT:]
+            return files.head(content_path)
+
+        elif spec.type in ("float", "integer") and output_plan.regex is not None:
+            # Search the mapped bytes; only the matched group is decoded
+            match = _search(output_plan, files.mapped(content_path))
+            if not match:
+                return None
+            group = match.group(1).decode(errors="replace")
+            return float(group) if spec.type == "float" else int(group)
 
         elif spec.type == "json":
+            data = files.json(content_path)
+            if data is None:
+                return None
+            # Navigate path like "results.energy" (pre-split by the plan)
+            for part in output_plan.json_path:
+                data = data.get(part, {})
+            return data
+
+        return files.text(content_path)
+
+
+class _RunFiles:
+    """Per-run cache of resolved output paths and their contents.
+
+    Lives for one _parse_outputs call; closing it unmaps every mapped file.
+    """
+
+    def __init__(self, working_dir: Path, stdout_path: Path):
+        self.working_dir = working_dir
+        self.stdout_path = stdout_path
+        self._paths: dict[str, Optional[Path]] = {}
+        self._maps: dict[Path, Union[mmap.mmap, bytes]] = {}
+        self._heads: dict[Path, str] = {}
+        self._texts: dict[Path, str] = {}
+        self._json: dict[Path, Any] = {}
+        self._stack = ExitStack()
+
+    def __enter__(self) -> _RunFiles:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._maps.clear()
+        self._stack.close()
+
+    def resolve(self, output_plan: OutputPlan) -> Optional[Path]:
+        """File an output spec reads; stdout if the file does not exist, None if a glob is empty."""
+        path_template = output_plan.path.source
+        if path_template not in self._paths:
+            # Resolve path (may contain wildcards)
+            path_pattern = output_plan.path.render({"working_dir": str(self.working_dir)})
+
+            content_path: Optional[Path]
+            if output_plan.is_glob:
+                import glob
+
+                files = glob.glob(path_pattern)
+                content_path = Path(files[0]) if files else None
+            else:
+                content_path = Path(path_pattern)
+                if not content_path.exists():
+                    # Try stdout if file not found
+                    content_path = self.stdout_path
+            self._paths[path_template] = content_path
+        return self._paths[path_template]
+
+    def mapped(self, path: Path) -> Union[mmap.mmap, bytes]:
+        if path not in self._maps:
+            self._maps[path] = self._stack.enter_context(_map_file(path))
+        return self._maps[path]
+
+    def head(self, path: Path) -> str:
+        if path not in self._heads:
+            self._heads[path] = _read_head(path, TEXT_OUTPUT_LIMIT)
+        return self._heads[path]
+
+    def text(self, path: Path) -> str:
+        if path not in self._texts:
+            self._texts[path] = read_log(path)
+        return self._texts[path]
+
+    def json(self, path: Path) -> Any:
+        """Parsed JSON content, None if the file is not valid JSON."""
+        if path not in self._json:
             import json
 
             try:
-                data = json.loads(content)
-                if spec.json_path:
-                    # Navigate path like "results.energy"
-                    parts = spec.json_path.split(".")
-                    for part in parts:
-                        data = data.get(part, {})
-                    return data
-                return data
+                self._json[path] = json.loads(self.text(path))
             except json.JSONDecodeError:
-                return None
-
-        return content
+                self._json[path] = None
+        return self._json[path]
+
+
+def _search(
+    output_plan: OutputPlan, data: Union[mmap.mmap, bytes]
+) -> Optional[re.Match[bytes]]:
+    """Apply the output's regex according to search_from, anchor and search_window."""
+    spec = output_plan.spec
+    regex = output_plan.regex
+    anchor = output_plan.anchor
+    assert regex is not None
+    size = len(data)
+    limit = size if spec.search_window is None else min(size, spec.search_window)
+
+    if spec.search_from == "start":
+        if anchor is None:
+            return regex.search(data, 0, limit)
+        pos = data.find(anchor, 0, limit)
+        return regex.search(data, pos + len(anchor), limit) if pos >= 0 else None
+
+    # From the end: look at a growing tail until something matches
+    span = min(TAIL_BLOCK_SIZE, limit)
+    while True:
+        start = size - span
+        if anchor is not None:
+            pos = data.rfind(anchor, start)
+            if pos >= 0:
+                return regex.search(data, pos + len(anchor))
+        else:
+            last = None
+            for last in regex.finditer(data, start):
+                pass
+            if last is not None:
+                return last
+        if span >= limit:
+            return None
+        span = min(span * 4, limit)
+
+
+@contextmanager
+def _map_file(path: Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Map a file read-only, so regexes scan it without a copy in memory.
+
+    Missing and empty files (which cannot be mapped) yield b"".
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        yield b""
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _read_head(path: Path, max_chars: int) -> str:
+    """First max_chars characters of a file, without reading the rest."""
+    try:
+        with open(path, errors="replace") as f:
+            return f.read(max_chars)
+    except OSError:
+        return ""
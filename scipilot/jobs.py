@@ -0,0 +1,141 @@
+"""Background jobs for long-running operations."""
+
+from __future__ import annotations
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from .executor import ExecutionResult, ToolExecutor
+from .models import Operation, ToolDescriptor
+
+JobStatus = Literal["pending", "running", "succeeded", "failed", "cancelled"]
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+
+
+class Job:
+    """One submitted operation run."""
+
+    def __init__(
+        self,
+        job_id: str,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        priority: int = 0,
+    ):
+        self.job_id = job_id
+        self.tool = tool
+        self.operation = operation
+        self.inputs = inputs
+        self.status: JobStatus = "pending"
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[ExecutionResult] = None
+        self.error: Optional[str] = None
+        self.priority = priority
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "tool": self.tool.name,
+            "operation": self.operation.name,
+            "status": self.status,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Run operations as asyncio tasks and track them by job id."""
+
+    def __init__(self, executor: ToolExecutor, max_finished: int = 1000):
+        self.executor = executor
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def submit(
+        self,
+        tool: ToolDescriptor,
+        operation: Operation,
+        inputs: dict[str, Any],
+        priority: int = 0,
+    ) -> Job:
+        """Start an operation in the background and return its job right away.
+
+        Must be called from within a running event loop.
+        """
+        job = Job(uuid.uuid4().hex, tool, operation, inputs, priority)
+        job._task = asyncio.get_running_loop().create_task(self._run(job))
+        self._jobs[job.job_id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get job by id."""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        """List tracked jobs, oldest first."""
+        return list(self._jobs.values())
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Wait up to timeout seconds for a job to finish.
+
+        Returns the job whether or not it finished; the caller checks job.done.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job._task is None or job.done:
+            return job
+        # shield: a timed-out wait must not cancel the job itself
+        try:
+            await asyncio.wait_for(asyncio.shield(job._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation. Returns False if the job is unknown or already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job._task is None or job.done:
+            return False
+        if job.status == "pending":
+            # The task may not have started, and then _run does not record the outcome
+            job.status = "cancelled"
+            job.finished_at = datetime.now()
+        return job._task.cancel()
+
+    async def _run(self, job: Job) -> None:
+        def started() -> None:
+            # Jobs stay pending while they wait for a slot or resources
+            job.status = "running"
+            job.started_at = datetime.now()
+
+        try:
+            job.result = await self.executor.execute_async(
+                job.tool, job.operation, job.inputs, priority=job.priority, on_start=started
+            )
+            job.status = "succeeded" if job.result.success else "failed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_finished."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,14 @@
+"""Diagnostics of the server process."""
+
+from __future__ import annotations
+
+import sys
+
+
+def log(message: str) -> None:
+    """Print a diagnostic line to stderr.
+
+    Never stdout: with the stdio transport it carries the MCP protocol, and a
+    stray line there breaks the client's connection.
+    """
+    print(message, file=sys.stderr)
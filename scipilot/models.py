@@ -1,9 +1,9 @@
 """Pydantic models for tool descriptors."""
 
 from __future__ import annotations
-from typing import Any, List, Literal, Optional
+from typing import Any, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class EnvironmentConfig(BaseModel):
@@ -19,6 +19,19 @@ class EnvironmentConfig(BaseModel):
     )
 
 
+class WorkerConfig(BaseModel):
+    """Limits for the persistent worker processes of a tool."""
+
+    preload: List[str] = Field(
+        default_factory=list, description="Modules imported once when a worker starts"
+    )
+    max_calls: int = Field(default=200, ge=1, description="Calls before a worker is replaced")
+    max_rss_mb: Optional[float] = Field(
+        default=None, gt=0, description="Replace a worker once its memory exceeds this"
+    )
+    max_idle: int = Field(default=4, ge=1, description="Idle workers kept per environment")
+
+
 class ToolMetadata(BaseModel):
     """Tool identification and metadata."""
 
@@ -32,6 +45,14 @@ class ToolMetadata(BaseModel):
     environment: Optional[EnvironmentConfig] = Field(
         default=None, description="Optional conda/venv environment configuration"
     )
+    disk_quota_mb: Optional[float] = Field(
+        default=None, description="Disk budget for this tool's run directories"
+    )
+
+    # Python tools only: run calls in long-lived workers that keep imports loaded.
+    # Applies to argv_template operations invoking "python script.py ..." (or -m/-c).
+    persistent: bool = False
+    worker: WorkerConfig = Field(default_factory=WorkerConfig)
 
 
 class InputSpec(BaseModel):
@@ -62,6 +83,21 @@ class InputSpec(BaseModel):
     )
 
 
+class StopRule(BaseModel):
+    """When a numeric output has converged enough to stop the run early."""
+
+    # "std_error": the block-averaged standard error of all values so far is below
+    # tolerance. "change": the last `samples` values span less than tolerance.
+    criterion: Literal["std_error", "change"] = "std_error"
+    tolerance: float = Field(gt=0)
+    # tolerance is a fraction of the mean's magnitude instead of an absolute value
+    relative: bool = False
+    samples: int = Field(
+        default=10, ge=2, description="Values needed before the rule is checked"
+    )
+    blocks: int = Field(default=5, ge=2, description="Blocks averaged for std_error")
+
+
 class OutputSpec(BaseModel):
     """Specification for output extraction."""
 
@@ -73,9 +109,32 @@ class OutputSpec(BaseModel):
     # For regex extraction
     extract_pattern: Optional[str] = None
 
+    # Where to search: "start" takes the first match, "end" takes the last one and
+    # scans backwards from the end of the file, touching only its tail. anchor is a
+    # literal marker (e.g. a final-summary header); the pattern is then matched
+    # after its first ("start") or last ("end") occurrence. search_window bounds
+    # the bytes scanned from the chosen side.
+    search_from: Literal["start", "end"] = "start"
+    search_window: Optional[int] = Field(default=None, gt=0)
+    anchor: Optional[str] = None
+
     # For JSON extraction
     json_path: Optional[str] = None  # e.g., "results.energy"
 
+    # Stop the run once this output's streamed values converge (needs
+    # extract_pattern). With rules on several outputs, all must be met.
+    stop_when: Optional[StopRule] = None
+
+
+class Resources(BaseModel):
+    """Host resources one run needs, used by the local scheduler."""
+
+    cpus: float = Field(default=1, gt=0, description="CPU cores used by one run")
+    memory_mb: Optional[int] = Field(default=None, ge=0, description="Peak memory of one run")
+    walltime: Optional[float] = Field(
+        default=None, gt=0, description="Expected run time in seconds (defaults to timeout)"
+    )
+
 
 class Operation(BaseModel):
     """One callable operation for this tool."""
@@ -87,15 +146,44 @@ class Operation(BaseModel):
 
     # Command construction
     command_template: str = Field(
-        description="Template for command line, uses {input_name} placeholders"
+        default="", description="Template for command line, uses {input_name} placeholders"
+    )
+
+    # Alternative to command_template: one template per argument, run without a
+    # shell. An element that is exactly "{input_name}" expands to the input's
+    # arg_template words, or to nothing when the input has no value.
+    argv_template: Optional[List[str]] = Field(
+        default=None, description="Command as a list of arguments, executed without a shell"
     )
 
-    # Execution mode
+    # Execution mode: serial runs of a tool never overlap; parallel runs share
+    # max_parallel slots per operation (default: executor setting, CPU count)
     execution_mode: Literal["serial", "parallel"] = "serial"
+    max_parallel: Optional[int] = Field(
+        default=None, ge=1, description="Concurrent runs allowed in parallel mode"
+    )
+
+    # Declared resources; runs without them bypass the resource scheduler
+    resources: Optional[Resources] = None
 
     # Timeout in seconds
     timeout: int = 3600
 
+    # Progress reported while running: group 1 of progress_pattern is the current
+    # step, group 2 (optional) the total, e.g. "Current cycle: (\d+) out of (\d+)".
+    # Without group 2, progress_total gives the total or names the input holding it.
+    progress_pattern: Optional[str] = None
+    progress_path: Optional[str] = Field(
+        default=None, description="File to watch for progress_pattern (default: stdout)"
+    )
+    progress_total: Optional[Union[float, str]] = None
+
+    # Whether identical runs may be served from the result cache
+    cacheable: bool = True
+
+    # Compiled execution plan, see plan.get_plan
+    _plan: Any = PrivateAttr(default=None)
+
 
 class ToolDescriptor(BaseModel):
     """Complete tool description from YAML."""
@@ -0,0 +1,238 @@
+"""Execution plans: operations compiled once at load time.
+
+A plan holds everything the executor would otherwise recompute per call:
+parsed str.format templates, compiled output regexes, tokenized JSON paths
+and classified output paths. Compiling also validates placeholders, so a
+typo in a descriptor fails at load instead of with a KeyError mid-run.
+
+Operations with an argv_template get one template per argument instead of a
+command line, and each input's arg_template is split into argument words.
+"""
+
+from __future__ import annotations
+import re
+import shlex
+import string
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional
+
+from .models import InputSpec, Operation, OutputSpec
+
+# Placeholders every command template may use besides input names
+COMMAND_BUILTINS = frozenset({"binary", "working_dir", "run_id"})
+ARG_FIELDS = frozenset({"value"})
+OUTPUT_PATH_FIELDS = frozenset({"working_dir"})
+
+_CONVERSIONS: dict[str, Callable[[Any], str]] = {"r": repr, "s": str, "a": ascii}
+
+
+@dataclass(frozen=True)
+class Template:
+    """A str.format template parsed once, rendered many times."""
+
+    source: str
+    # (literal text, field name or None, conversion or None, format spec)
+    segments: tuple[tuple[str, Optional[str], Optional[str], str], ...]
+    fields: frozenset[str]
+
+    @classmethod
+    def parse(cls, source: str, allowed: frozenset[str], where: str) -> Template:
+        segments = []
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise ValueError(f"{where}: invalid template: {e}") from None
+
+        for literal, field, format_spec, conversion in parsed:
+            if field is not None:
+                if not field.isidentifier():
+                    raise ValueError(f"{where}: unsupported placeholder {{{field}}}")
+                if field not in allowed:
+                    raise ValueError(
+                        f"{where}: unknown placeholder {{{field}}}"
+                        f" (known: {', '.join(sorted(allowed))})"
+                    )
+                if format_spec and "{" in format_spec:
+                    raise ValueError(f"{where}: nested placeholders are not supported")
+            segments.append((literal, field, conversion, format_spec or ""))
+
+        fields = frozenset(field for _, field, _, _ in segments if field is not None)
+        return cls(source, tuple(segments), fields)
+
+    @property
+    def sole_field(self) -> Optional[str]:
+        """Placeholder name if the template is exactly "{name}", else None."""
+        if len(self.segments) == 1:
+            literal, field, conversion, format_spec = self.segments[0]
+            if not literal and not conversion and not format_spec:
+                return field
+        return None
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Same result as source.format(**values)."""
+        parts = []
+        for literal, field, conversion, format_spec in self.segments:
+            parts.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion:
+                    value = _CONVERSIONS[conversion](value)
+                parts.append(format(value, format_spec))
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class InputPlan:
+    spec: InputSpec
+    arg: Template
+    # arg_template split into argument words; empty unless the operation has an argv_template
+    arg_words: tuple[Template, ...]
+
+
+@dataclass(frozen=True)
+class OutputPlan:
+    spec: OutputSpec
+    path: Template
+    is_glob: bool
+    regex: Optional[re.Pattern[bytes]]
+    anchor: Optional[bytes]
+    json_path: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ProgressPlan:
+    regex: re.Pattern[bytes]
+    # None: the run's stdout
+    path: Optional[Template]
+    is_glob: bool
+    total: Optional[float]
+    total_input: Optional[str]
+
+    def total_for(self, inputs: Mapping[str, Any]) -> Optional[float]:
+        """Total steps of a run, unless the pattern's second group supplies it."""
+        if self.total_input is None:
+            return self.total
+        try:
+            return float(inputs[self.total_input])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+@dataclass(frozen=True)
+class OperationPlan:
+    command: Optional[Template]
+    inputs: tuple[InputPlan, ...]
+    outputs: tuple[OutputPlan, ...]
+    # Set for argv_template operations, which run without a shell
+    argv: Optional[tuple[Template, ...]] = None
+    progress: Optional[ProgressPlan] = None
+
+
+def compile_operation(operation: Operation) -> OperationPlan:
+    """Compile and validate an operation. Raises ValueError on bad templates or regexes."""
+    where = f"operation {operation.name}"
+    input_names = frozenset(inp.name for inp in operation.inputs)
+    allowed = input_names | COMMAND_BUILTINS
+
+    if operation.argv_template is not None:
+        if not operation.argv_template:
+            raise ValueError(f"{where}: argv_template must not be empty")
+        command = None
+        argv: Optional[tuple[Template, ...]] = tuple(
+            Template.parse(arg, allowed, f"{where} argv_template[{i}]")
+            for i, arg in enumerate(operation.argv_template)
+        )
+    elif operation.command_template:
+        command = Template.parse(
+            operation.command_template, allowed, f"{where} command_template"
+        )
+        argv = None
+    else:
+        raise ValueError(f"{where}: needs a command_template or an argv_template")
+
+    inputs = tuple(
+        _compile_input(inp, f"{where} input {inp.name}", split=argv is not None)
+        for inp in operation.inputs
+    )
+    outputs = tuple(_compile_output(out, f"{where} output {out.name}") for out in operation.outputs)
+    progress = _compile_progress(operation, input_names, where)
+    return OperationPlan(command, inputs, outputs, argv, progress)
+
+
+def get_plan(operation: Operation) -> OperationPlan:
+    """The operation's plan, compiled on first use if the registry has not done it."""
+    plan: Optional[OperationPlan] = operation._plan
+    if plan is None:
+        plan = compile_operation(operation)
+        operation._plan = plan
+    return plan
+
+
+def _compile_input(spec: InputSpec, where: str, split: bool) -> InputPlan:
+    words: list[str] = []
+    if split:
+        try:
+            words = shlex.split(spec.arg_template)
+        except ValueError as e:
+            raise ValueError(f"{where}: invalid arg_template: {e}") from None
+    return InputPlan(
+        spec=spec,
+        arg=Template.parse(spec.arg_template, ARG_FIELDS, where),
+        arg_words=tuple(Template.parse(word, ARG_FIELDS, where) for word in words),
+    )
+
+
+def _compile_progress(
+    operation: Operation, input_names: frozenset[str], where: str
+) -> Optional[ProgressPlan]:
+    if operation.progress_pattern is None:
+        return None
+    try:
+        regex = re.compile(operation.progress_pattern.encode())
+    except re.error as e:
+        raise ValueError(f"{where}: invalid progress_pattern: {e}") from None
+    if regex.groups < 1:
+        raise ValueError(f"{where}: progress_pattern needs a group capturing the current step")
+
+    total: Optional[float] = None
+    total_input: Optional[str] = None
+    if isinstance(operation.progress_total, str):
+        if operation.progress_total not in input_names:
+            raise ValueError(
+                f"{where}: progress_total {operation.progress_total!r} is not an input"
+            )
+        total_input = operation.progress_total
+    elif operation.progress_total is not None:
+        total = float(operation.progress_total)
+
+    path = None
+    if operation.progress_path is not None:
+        path = Template.parse(operation.progress_path, OUTPUT_PATH_FIELDS, f"{where} progress_path")
+    return ProgressPlan(
+        regex=regex,
+        path=path,
+        is_glob=path is not None and "*" in path.source,
+        total=total,
+        total_input=total_input,
+    )
+
+
+def _compile_output(spec: OutputSpec, where: str) -> OutputPlan:
+    regex = None
+    if spec.extract_pattern:
+        try:
+            # Matched against raw file bytes; only matched groups get decoded
+            regex = re.compile(spec.extract_pattern.encode())
+        except re.error as e:
+            raise ValueError(f"{where}: invalid extract_pattern: {e}") from None
+    if spec.stop_when is not None and (regex is None or spec.type not in ("float", "integer")):
+        raise ValueError(f"{where}: stop_when needs a float or integer output with extract_pattern")
+
+    return OutputPlan(
+        spec=spec,
+        path=Template.parse(spec.path, OUTPUT_PATH_FIELDS, f"{where} path"),
+        is_glob="*" in spec.path,
+        regex=regex,
+        anchor=spec.anchor.encode() if spec.anchor else None,
+        json_path=tuple(spec.json_path.split(".")) if spec.json_path else (),
+    )
@@ -0,0 +1,237 @@
+"""Process groups of runs: group-wide termination and reaping of leftovers.
+
+Every run is started in its own session, so the shell, the simulation it
+starts and any MPI ranks share one process group that can be signalled as
+a whole. Runs also export RUN_DIR_VAR, which their descendants inherit even
+if they leave the group; the OrphanReaper uses it to find processes of
+finished runs.
+"""
+
+from __future__ import annotations
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from .log import log
+from .runs import owner_gone, pid_alive, read_run_meta
+
+# Set in every run's environment to the run directory
+RUN_DIR_VAR = "SCIPILOT_RUN_DIR"
+
+# Seconds a run's processes get to exit after SIGTERM before SIGKILL
+KILL_GRACE_PERIOD = 10.0
+
+# Seconds between checks whether a terminated group is gone
+_GROUP_POLL = 0.05
+
+
+def run_environment(env: Optional[dict[str, str]], run_dir: Path) -> dict[str, str]:
+    """Environment for a run's process (None: inherit), tagged with its run directory."""
+    return {**(os.environ if env is None else env), RUN_DIR_VAR: os.path.abspath(run_dir)}
+
+
+def signal_group(pgid: int, sig: int) -> bool:
+    """Send a signal to a process group; False if the group is gone."""
+    try:
+        os.killpg(pgid, sig)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # a member changed user; the others still got it
+    return True
+
+
+def group_members(pgid: int) -> list[int]:
+    """Live (non-zombie) processes of a process group.
+
+    Zombies are skipped: in containers whose init does not reap, exited
+    orphans linger as zombies but hold no resources.
+    """
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        # No procfs (macOS): the group exists while any member does
+        return [pgid] if signal_group(pgid, 0) else []
+    members = []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesized command name: state ppid pgrp ...
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        if len(fields) > 2 and int(fields[2]) == pgid and fields[0] != b"Z":
+            members.append(int(entry))
+    return members
+
+
+def wait_group(pgid: int, timeout: float) -> bool:
+    """Wait for a process group to empty; False if members are left after timeout."""
+    deadline = time.monotonic() + timeout
+    while group_members(pgid):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(_GROUP_POLL)
+    return True
+
+
+def terminate_group(process: subprocess.Popen[bytes], grace: float = KILL_GRACE_PERIOD) -> None:
+    """SIGTERM a run's process group, SIGKILL whatever is left after grace seconds."""
+    deadline = time.monotonic() + grace
+    signal_group(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    if not wait_group(process.pid, max(deadline - time.monotonic(), 0.0)):
+        signal_group(process.pid, signal.SIGKILL)
+    process.wait()
+
+
+async def terminate_group_async(
+    process: asyncio.subprocess.Process, grace: float = KILL_GRACE_PERIOD
+) -> None:
+    """terminate_group for processes started by asyncio."""
+    deadline = time.monotonic() + grace
+    signal_group(process.pid, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=grace)
+    except asyncio.TimeoutError:
+        pass
+    remaining = max(deadline - time.monotonic(), 0.0)
+    if not await asyncio.to_thread(wait_group, process.pid, remaining):
+        signal_group(process.pid, signal.SIGKILL)
+    await process.wait()
+
+
+def reap_group(pgid: int, grace: float = KILL_GRACE_PERIOD) -> list[int]:
+    """Terminate processes a finished run left in its group; returns their pids.
+
+    Called after the group leader has exited, e.g. for a shell that put the
+    simulation in the background and returned.
+    """
+    left = group_members(pgid)
+    if not left:
+        return []
+    log(
+        f"Run process group {pgid} left {len(left)} processes running "
+        f"({', '.join(map(str, left))}); terminating them"
+    )
+    signal_group(pgid, signal.SIGTERM)
+    if not wait_group(pgid, grace):
+        signal_group(pgid, signal.SIGKILL)
+    return left
+
+
+def run_processes() -> dict[str, list[int]]:
+    """Processes tagged with a run directory, by run directory. Empty without procfs."""
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return {}
+    prefix = RUN_DIR_VAR.encode() + b"="
+    found: dict[str, list[int]] = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/environ", "rb") as f:
+                environ = f.read()
+        except OSError:
+            continue  # gone, or another user's
+        for variable in environ.split(b"\0"):
+            if variable.startswith(prefix):
+                run_dir = variable[len(prefix) :].decode(errors="surrogateescape")
+                found.setdefault(run_dir, []).append(int(entry))
+                break
+    return found
+
+
+class OrphanReaper:
+    """Find and stop processes that outlived their run.
+
+    Group termination misses processes that started a session of their own
+    (daemonizing launchers, some MPI process managers). They still carry
+    the run directory in their environment; those belonging to a run under
+    base_dir that is recorded as finished, or as running by a server on this
+    host that has since exited, are reported and terminated. Other runs
+    still marked running, possibly by another server, are left alone.
+    """
+
+    def __init__(self, base_dir: Union[Path, str], grace: float = KILL_GRACE_PERIOD):
+        self.base_dir = Path(os.path.abspath(base_dir))
+        self.grace = grace
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> dict[str, list[int]]:
+        """Terminate orphaned processes once; returns them by run directory."""
+        orphans = {}
+        for run_dir, pids in run_processes().items():
+            path = Path(run_dir)
+            if not path.is_relative_to(self.base_dir):
+                continue
+            meta = read_run_meta(path)
+            if meta.get("status", "running") == "running" and not owner_gone(meta):
+                continue
+            pids = [pid for pid in pids if pid != os.getpid()]
+            if pids:
+                orphans[run_dir] = pids
+
+        for run_dir, pids in orphans.items():
+            log(
+                f"Terminating {len(pids)} orphaned processes of run {run_dir}: "
+                f"{', '.join(map(str, pids))}"
+            )
+            self._terminate(pids)
+        return orphans
+
+    def start(self, interval: float = 60.0) -> None:
+        """Sweep periodically in a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name="scipilot-reaper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background reaper."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                log(f"Orphan sweep failed: {e}")
+
+    def _terminate(self, pids: list[int]) -> None:
+        for pid in pids:
+            _signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.grace
+        while time.monotonic() < deadline and any(pid_alive(pid) for pid in pids):
+            time.sleep(_GROUP_POLL)
+        for pid in pids:
+            if pid_alive(pid):
+                _signal(pid, signal.SIGKILL)
+
+
+def _signal(pid: int, sig: int) -> None:
+    try:
+        os.kill(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
@@ -0,0 +1,223 @@
+"""Progress and partial results of running operations, read from their growing output."""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .convergence import converged_value
+from .log import log
+from .plan import OperationPlan, Template
+
+# Seconds between looks at a running process's output
+PROGRESS_INTERVAL = 2.0
+
+# Per poll and file, at most this many new bytes are scanned; older ones are skipped
+# (and so are their samples for stop rules)
+MAX_POLL_BYTES = 1024 * 1024
+
+
+@dataclass
+class ProgressUpdate:
+    """Progress of a running operation and the latest values of its outputs."""
+
+    progress: float
+    total: Optional[float] = None
+    values: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def message(self) -> str:
+        parts = [f"{self.progress:g}/{self.total:g}" if self.total else f"{self.progress:g}"]
+        parts += [f"{name}={value}" for name, value in self.values.items()]
+        return ", ".join(parts)
+
+
+ProgressCallback = Callable[[ProgressUpdate], Awaitable[None]]
+StopCallback = Callable[[dict[str, float]], Awaitable[None]]
+
+
+class _Tail:
+    """Reads the complete lines appended to a file since the previous read."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offset = 0
+        self.carry = b""
+
+    def read_new(self) -> bytes:
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self.offset:
+                    self.offset, self.carry = 0, b""  # truncated or replaced
+                if size - self.offset > MAX_POLL_BYTES:
+                    # Only the latest values matter; skip to the recent output
+                    self.offset, self.carry = size - MAX_POLL_BYTES, b""
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+        except OSError:
+            return b""
+        self.offset += len(data)
+        data = self.carry + data
+        # Keep an unfinished last line for the next read
+        end = data.rfind(b"\n") + 1
+        self.carry = data[end:]
+        return data[:end]
+
+
+class ProgressMonitor:
+    """Follow a run's stdout and output files while the process is running.
+
+    Each poll scans only the lines written since the previous one. The
+    operation's progress_pattern yields the step (and total), and numeric
+    outputs with an extract_pattern yield their latest matched value. Outputs
+    with a stop rule also keep every matched value; once all their rules are
+    met, converged holds the estimates and the run can be stopped.
+    """
+
+    def __init__(
+        self,
+        plan: OperationPlan,
+        working_dir: Path,
+        stdout_path: Path,
+        inputs: dict[str, Any],
+    ):
+        self.plan = plan
+        self.working_dir = working_dir
+        self.stdout_path = stdout_path
+        self.total = plan.progress.total_for(inputs) if plan.progress else None
+        self._outputs = [
+            output
+            for output in plan.outputs
+            if output.regex is not None and output.spec.type in ("float", "integer")
+        ]
+        self._series: dict[str, list[float]] = {
+            output.spec.name: [] for output in self._outputs if output.spec.stop_when
+        }
+        self.converged: Optional[dict[str, float]] = None
+        self._tails: dict[Path, _Tail] = {}
+        self._progress: Optional[float] = None
+        self._values: dict[str, Any] = {}
+        self._sent: Optional[tuple[Any, ...]] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether there is anything to report for this operation."""
+        return self.plan.progress is not None or bool(self._outputs)
+
+    @property
+    def stops(self) -> bool:
+        """Whether the operation has outputs with stop rules."""
+        return bool(self._series)
+
+    def poll(self) -> Optional[ProgressUpdate]:
+        """Scan new output; an update if anything changed since the last one."""
+        chunks: dict[Path, bytes] = {}
+
+        def new_data(path: Optional[Path]) -> bytes:
+            if path is None:
+                return b""
+            if path not in chunks:
+                tail = self._tails.setdefault(path, _Tail(path))
+                chunks[path] = tail.read_new()
+            return chunks[path]
+
+        progress_plan = self.plan.progress
+        if progress_plan is not None:
+            path = (
+                self._resolve(progress_plan.path, progress_plan.is_glob)
+                if progress_plan.path is not None
+                else self.stdout_path
+            )
+            last = _last_match(progress_plan.regex.finditer(new_data(path)))
+            if last is not None:
+                try:
+                    self._progress = float(last.group(1))
+                    if last.re.groups >= 2:
+                        self.total = float(last.group(2))
+                except ValueError:
+                    pass
+
+        for output in self._outputs:
+            assert output.regex is not None
+            path = self._resolve(output.path, output.is_glob)
+            series = self._series.get(output.spec.name)
+            for match in output.regex.finditer(new_data(path)):
+                value = _number(match, output.spec.type)
+                if value is None:
+                    continue
+                self._values[output.spec.name] = value
+                if series is not None:
+                    series.append(float(value))
+        self._check_convergence()
+
+        state = (self._progress, self.total, tuple(self._values.items()))
+        if state == self._sent or (self._progress is None and not self._values):
+            return None
+        self._sent = state
+        return ProgressUpdate(self._progress or 0.0, self.total, dict(self._values))
+
+    async def run(
+        self,
+        callback: Optional[ProgressCallback],
+        interval: float = PROGRESS_INTERVAL,
+        on_converged: Optional[StopCallback] = None,
+    ) -> None:
+        """Report updates until cancelled, or until on_converged has stopped the run.
+
+        on_converged receives the estimates once all stop rules are met.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            update = await asyncio.to_thread(self.poll)
+            if update is not None and callback is not None:
+                try:
+                    await callback(update)
+                except Exception as e:
+                    # A client that went away must not fail the run
+                    log(f"Progress report failed: {e}")
+            if self.converged is not None and on_converged is not None:
+                await on_converged(self.converged)
+                return
+
+    def _check_convergence(self) -> None:
+        if not self._series or self.converged is not None:
+            return
+        estimates = {}
+        for output in self._outputs:
+            rule = output.spec.stop_when
+            if rule is None:
+                continue
+            estimate = converged_value(rule, self._series[output.spec.name])
+            if estimate is None:
+                return
+            estimates[output.spec.name] = estimate
+        self.converged = estimates
+
+    def _resolve(self, template: Template, is_glob: bool) -> Optional[Path]:
+        """Like final extraction: glob's first match, or stdout for a missing file."""
+        pattern = template.render({"working_dir": str(self.working_dir)})
+        if is_glob:
+            matches = glob.glob(pattern)
+            return Path(matches[0]) if matches else None
+        path = Path(pattern)
+        return path if path.exists() else self.stdout_path
+
+
+def _number(match: Any, type_: str) -> Optional[float]:
+    group = match.group(1).decode(errors="replace")
+    try:
+        return float(group) if type_ == "float" else int(group)
+    except ValueError:
+        return None
+
+
+def _last_match(matches: Any) -> Any:
+    last = None
+    for last in matches:
+        pass
+    return last
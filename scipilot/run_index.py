@@ -0,0 +1,200 @@
+"""SQLite catalog of runs: inputs, outputs, timings and status."""
+
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    tool        TEXT NOT NULL,
+    operation   TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    return_code INTEGER,
+    started_at  REAL NOT NULL,
+    ended_at    REAL,
+    working_dir TEXT NOT NULL,
+    inputs      TEXT NOT NULL,
+    outputs     TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_tool_time ON runs (tool, operation, started_at);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (started_at);
+
+-- One row per input value, so runs can be filtered on inputs without parsing JSON
+CREATE TABLE IF NOT EXISTS run_inputs (
+    run_id TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name   TEXT NOT NULL,
+    value  TEXT,
+    num    REAL
+);
+CREATE INDEX IF NOT EXISTS run_inputs_value ON run_inputs (name, value);
+CREATE INDEX IF NOT EXISTS run_inputs_num ON run_inputs (name, num);
+"""
+
+Timestamp = Union[float, str, datetime]
+
+
+class RunIndex:
+    """Indexed record of every execution, safe for concurrent writers.
+
+    The database runs in WAL mode, so readers never block the writer. Each
+    thread uses its own connection.
+    """
+
+    def __init__(self, db_path: Union[Path, str]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def record_start(
+        self,
+        run_id: str,
+        tool: str,
+        operation: str,
+        inputs: dict[str, Any],
+        working_dir: Union[Path, str],
+        started_at: float,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs"
+                " (run_id, tool, operation, status, started_at, working_dir, inputs)"
+                " VALUES (?, ?, ?, 'running', ?, ?, ?)",
+                (run_id, tool, operation, started_at, str(working_dir), _dumps(inputs)),
+            )
+            conn.execute("DELETE FROM run_inputs WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO run_inputs (run_id, name, value, num) VALUES (?, ?, ?, ?)",
+                [(run_id, name, _text(value), _number(value)) for name, value in inputs.items()],
+            )
+
+    def record_finish(
+        self,
+        run_id: str,
+        status: str,
+        return_code: Optional[int],
+        outputs: Optional[dict[str, Any]],
+        ended_at: float,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET status = ?, return_code = ?, outputs = ?, ended_at = ?"
+                " WHERE run_id = ?",
+                (status, return_code, _dumps(outputs or {}), ended_at, run_id),
+            )
+
+    def query(
+        self,
+        tool: Optional[str] = None,
+        operation: Optional[str] = None,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        status: Optional[str] = None,
+        inputs: Optional[dict[str, Any]] = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Find runs, newest first.
+
+        inputs maps input names to an exact value or to a {"min", "max"}
+        numeric range (either bound optional).
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        for column, value in (("tool", tool), ("operation", operation), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("started_at >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            clauses.append("started_at < ?")
+            params.append(_timestamp(until))
+
+        for name, condition in (inputs or {}).items():
+            sub = "SELECT run_id FROM run_inputs WHERE name = ?"
+            sub_params: list[Any] = [name]
+            if isinstance(condition, dict):
+                if condition.get("min") is not None:
+                    sub += " AND num >= ?"
+                    sub_params.append(float(condition["min"]))
+                if condition.get("max") is not None:
+                    sub += " AND num <= ?"
+                    sub_params.append(float(condition["max"]))
+            elif _number(condition) is not None:
+                sub += " AND num = ?"
+                sub_params.append(_number(condition))
+            else:
+                sub += " AND value = ?"
+                sub_params.append(_text(condition))
+            clauses.append(f"run_id IN ({sub})")
+            params.extend(sub_params)
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
+    data = dict(row)
+    data["inputs"] = json.loads(data["inputs"])
+    data["outputs"] = json.loads(data["outputs"]) if data["outputs"] else None
+    for key in ("started_at", "ended_at"):
+        if data[key] is not None:
+            data[key] = datetime.fromtimestamp(data[key]).isoformat()
+    return data
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _timestamp(value: Timestamp) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
@@ -0,0 +1,266 @@
+"""Run IDs, run directory layout, metadata and discovery.
+
+Run directories are sharded as <base>/<YYYY-MM-DD>/<tool>/<run_id>_<operation>,
+where run_id is a ULID: 26 Crockford base32 characters, a 48-bit millisecond
+timestamp followed by 80 random bits. ULIDs sort by creation time, and IDs made
+in the same millisecond by this process are strictly increasing. The date shard
+is the ULID's UTC date, so a run can be located from its ID alone.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import secrets
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional, Union
+
+# Bookkeeping lives in a hidden subdirectory so it does not clash with tool outputs
+RUN_META_DIR = ".scipilot"
+RUN_META_FILE = "run.json"
+STDOUT_LOG = "stdout.log"
+STDERR_LOG = "stderr.log"
+
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID_RE = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+_DATE_SHARD_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class _UlidGenerator:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> str:
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms <= self._last_ms:
+                # Same (or earlier, clock stepped back) millisecond: stay monotonic
+                ms = self._last_ms
+                random_bits = self._last_random + 1
+                if random_bits >= 1 << 80:
+                    ms += 1
+                    random_bits = secrets.randbits(80)
+            else:
+                random_bits = secrets.randbits(80)
+            self._last_ms, self._last_random = ms, random_bits
+        value = (ms << 80) | random_bits
+        return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+_ulids = _UlidGenerator()
+
+
+def new_run_id() -> str:
+    """Generate a collision-free, time-sortable run ID (ULID)."""
+    return _ulids.new()
+
+
+def is_run_id(value: str) -> bool:
+    return bool(_ULID_RE.match(value))
+
+
+def run_id_time(run_id: str) -> datetime:
+    """Creation time (UTC) encoded in a ULID run ID."""
+    value = 0
+    for char in run_id[:10]:
+        value = value * 32 + _CROCKFORD.index(char)
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def run_dir_for(base_dir: Union[Path, str], tool: str, operation: str, run_id: str) -> Path:
+    """Sharded working directory for a new run."""
+    shard = run_id_time(run_id).strftime("%Y-%m-%d")
+    return Path(base_dir) / shard / tool / f"{run_id}_{operation}"
+
+
+def resolve_run_dir(base_dir: Union[Path, str], run_id: str) -> Optional[Path]:
+    """Find the directory of a run.
+
+    Accepts a ULID run ID, the working directory path returned by the executor,
+    or the name of a directory from the old flat layout (<tool>_<op>_<timestamp>).
+    """
+    base = Path(base_dir)
+    if is_run_id(run_id):
+        shard = base / run_id_time(run_id).strftime("%Y-%m-%d")
+        for match in shard.glob(f"*/{run_id}_*"):
+            if match.is_dir():
+                return match
+        return None
+
+    path = Path(run_id)
+    if path.is_dir():
+        return path
+    legacy = base / run_id
+    if "/" not in run_id and legacy.is_dir():
+        return legacy
+    return None
+
+
+def meta_path(run_dir: Union[Path, str]) -> Path:
+    return Path(run_dir) / RUN_META_DIR / RUN_META_FILE
+
+
+class RunLogs(NamedTuple):
+    """Files a run's stdout and stderr are spooled to."""
+
+    stdout_path: Path
+    stderr_path: Path
+
+
+def log_paths(run_dir: Union[Path, str]) -> RunLogs:
+    """Files a run's stdout and stderr are spooled to."""
+    meta_dir = Path(run_dir) / RUN_META_DIR
+    return RunLogs(meta_dir / STDOUT_LOG, meta_dir / STDERR_LOG)
+
+
+def read_log(path: Optional[Path]) -> str:
+    """Whole log as text; empty if the log does not exist (e.g. evicted run)."""
+    if path is None:
+        return ""
+    try:
+        return path.read_text(errors="replace")
+    except OSError:
+        return ""
+
+
+def read_tail(path: Optional[Path], max_bytes: int) -> str:
+    """Last max_bytes of a log as text, without reading the rest of the file."""
+    if path is None:
+        return ""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - max_bytes))
+            return f.read().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def read_run_meta(run_dir: Union[Path, str]) -> dict[str, Any]:
+    """Read a run's metadata; empty dict for runs without (or with unreadable) metadata."""
+    try:
+        with open(meta_path(run_dir)) as f:
+            data: dict[str, Any] = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data
+
+
+def write_run_meta(run_dir: Union[Path, str], meta: dict[str, Any]) -> None:
+    """Replace a run's metadata atomically."""
+    path = meta_path(run_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def update_run_meta(run_dir: Union[Path, str], **fields: Any) -> dict[str, Any]:
+    """Merge fields into a run's metadata and return the result."""
+    meta = read_run_meta(run_dir)
+    meta.update(fields)
+    write_run_meta(run_dir, meta)
+    return meta
+
+
+def record_access(run_dir: Union[Path, str]) -> None:
+    """Note that a run's results were used again (feeds LRU/LFU eviction)."""
+    meta = read_run_meta(run_dir)
+    update_run_meta(run_dir, last_access=time.time(), hits=meta.get("hits", 0) + 1)
+
+
+def run_owner() -> dict[str, Any]:
+    """Metadata fields naming the server process that starts a run."""
+    return {"pid": os.getpid(), "host": socket.gethostname()}
+
+
+def owner_gone(meta: dict[str, Any]) -> bool:
+    """Whether the server that started a run is known to have exited.
+
+    Only owners on this host can be checked; runs started elsewhere, or
+    recorded without an owner, are assumed to be looked after.
+    """
+    pid = meta.get("pid")
+    if pid is None or meta.get("host") != socket.gethostname():
+        return False
+    return not pid_alive(pid)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # No procfs (macOS)
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # exists, owned by another user
+        return True
+    return stat[stat.rfind(b")") + 2 : stat.rfind(b")") + 3] != b"Z"
+
+
+def iter_run_dirs(base_dir: Union[Path, str]) -> Iterator[Path]:
+    """Yield run directories under base_dir in both sharded and old flat layouts.
+
+    Hidden bookkeeping dirs (such as the result cache) are skipped.
+    """
+    for entry in _subdirs(base_dir):
+        if not _DATE_SHARD_RE.match(entry.name):
+            yield Path(entry.path)  # old flat layout
+            continue
+        for tool_dir in _subdirs(entry.path):
+            for run_dir in _subdirs(tool_dir.path):
+                yield Path(run_dir.path)
+
+
+def remove_empty_shards(run_dir: Union[Path, str], base_dir: Union[Path, str]) -> None:
+    """Remove the tool and date shard dirs above a deleted run if they are now empty."""
+    base = Path(base_dir).resolve()
+    parent = Path(run_dir).resolve().parent
+    while parent != base and parent.is_relative_to(base):
+        try:
+            parent.rmdir()
+        except OSError:
+            return  # not empty
+        parent = parent.parent
+
+
+def _subdirs(path: Union[Path, str]) -> Iterator[os.DirEntry[str]]:
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+            yield entry
+
+
+def dir_size(path: Union[Path, str]) -> int:
+    """Total size in bytes of regular files under path (symlinks not followed)."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
@@ -0,0 +1,136 @@
+"""Ranked search over the operations of loaded tools."""
+
+from __future__ import annotations
+import bisect
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .models import Operation, ToolDescriptor
+
+# Weight of a term by where it occurs in an operation's description
+NAME_WEIGHT = 3.0
+INPUT_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+
+# Query terms at least this long also match longer words they are a prefix of
+MIN_PREFIX = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words; identifiers like helium_void_fraction split on underscores."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    tool: str
+    operation: str
+    description: str
+    score: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "operation": self.operation,
+            "description": self.description,
+            "score": round(self.score, 3),
+        }
+
+
+class ToolIndex:
+    """Inverted index from words to the operations they describe.
+
+    Tool and operation names, input names and all descriptions are indexed.
+    A hit scores the sum over query terms of the term's idf times its
+    strongest field weight in that operation, so rare words and name
+    matches rank first. Safe to update from one thread while others search.
+    """
+
+    def __init__(self, tools: Iterable[ToolDescriptor] = ()):
+        self._postings: dict[str, dict[tuple[str, str], float]] = {}
+        self._terms: list[str] = []  # sorted, for prefix lookup
+        self._docs: dict[tuple[str, str], str] = {}  # (tool, operation) -> description
+        self._lock = threading.Lock()
+        for tool in tools:
+            self.add_tool(tool)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add_tool(self, tool: ToolDescriptor) -> None:
+        """Index (or re-index) every operation of a tool."""
+        with self._lock:
+            self._remove_locked(tool.name)
+            for operation in tool.operations:
+                self._add_locked(tool, operation)
+            self._terms = sorted(self._postings)
+
+    def remove_tool(self, name: str) -> None:
+        with self._lock:
+            self._remove_locked(name)
+            self._terms = sorted(self._postings)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> tuple[int, list[SearchHit]]:
+        """Operations matching any query word, best first; returns (total, page)."""
+        terms = set(tokenize(query))
+        with self._lock:
+            total_docs = len(self._docs) or 1
+            scores: dict[tuple[str, str], float] = {}
+            for term in terms:
+                for match in self._expand_locked(term):
+                    postings = self._postings[match]
+                    idf = math.log(1 + total_docs / len(postings))
+                    if match != term:
+                        idf *= 0.5  # prefix matches count less than whole words
+                    for key, weight in postings.items():
+                        scores[key] = scores.get(key, 0.0) + idf * weight
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            page = [
+                SearchHit(tool, operation, self._docs[(tool, operation)], score)
+                for (tool, operation), score in ranked[offset : offset + limit]
+            ]
+        return len(ranked), page
+
+    def _expand_locked(self, term: str) -> list[str]:
+        if len(term) < MIN_PREFIX:
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._terms, term)
+        matches = []
+        for candidate in self._terms[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _add_locked(self, tool: ToolDescriptor, operation: Operation) -> None:
+        key = (tool.name, operation.name)
+        self._docs[key] = operation.description
+        fields = [
+            (f"{tool.name} {operation.name}", NAME_WEIGHT),
+            (" ".join(inp.name for inp in operation.inputs), INPUT_WEIGHT),
+            (tool.tool.description, TEXT_WEIGHT),
+            (operation.description, TEXT_WEIGHT),
+            (" ".join(inp.description for inp in operation.inputs), TEXT_WEIGHT),
+        ]
+        for text, weight in fields:
+            for term in tokenize(text):
+                postings = self._postings.setdefault(term, {})
+                postings[key] = max(postings.get(key, 0.0), weight)
+
+    def _remove_locked(self, tool_name: str) -> None:
+        keys = {key for key in self._docs if key[0] == tool_name}
+        if not keys:
+            return
+        for key in keys:
+            del self._docs[key]
+        for term in list(self._postings):
+            postings = self._postings[term]
+            for key in keys & postings.keys():
+                del postings[key]
+            if not postings:
+                del self._postings[term]
@@ -2,45 +2,182 @@
 
 from __future__ import annotations
 import argparse
+import asyncio
 import inspect
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Optional
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from mcp.server.session import ServerSession
 
+from .cache import ResultCache
+from .eviction import EvictionManager, EvictionPolicy
 from .executor import ToolExecutor
-from .models import ToolDescriptor, Operation
-from .tool_loader import ToolRegistry
+from .jobs import JobManager
+from .models import Operation, ToolDescriptor
+from .processes import KILL_GRACE_PERIOD, OrphanReaper
+from .progress import ProgressUpdate
+from .run_index import RunIndex
+from .runs import resolve_run_dir
+from .search import ToolIndex
+from .sweep import SweepMode, run_sweep
+from .tool_loader import RegistryChanges, ToolRegistry, default_cache_dir
+from .watcher import DescriptorWatcher
+
+
+# Handler parameter FastMCP injects the request Context into
+CONTEXT_PARAM = "_ctx"
+
+# Submit handler parameter for the job's scheduling priority
+PRIORITY_PARAM = "priority"
 
 
 def create_tool_function(
     tool: ToolDescriptor,
     operation: Operation,
     executor: ToolExecutor,
-) -> Callable[..., dict[str, Any]]:
-    """Create a function with proper signature for FastMCP using inspect.Signature."""
+) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Create an async function with proper signature for FastMCP using inspect.Signature.
+
+    Handlers await ToolExecutor.execute_async, so a long run does not block
+    other MCP calls served by the same process. While it runs, progress and
+    the latest output values are sent as MCP progress notifications to
+    clients that asked for them.
+    """
+
+    async def _impl(**kwargs: Any) -> dict[str, Any]:
+        ctx: Optional[Context] = kwargs.pop(CONTEXT_PARAM, None)
+
+        async def report(update: ProgressUpdate) -> None:
+            assert ctx is not None
+            await ctx.report_progress(update.progress, update.total, update.message)
+
+        # The context is injected into every call; only follow runs someone listens to
+        listening = ctx is not None and _progress_requested(ctx)
+        result = await executor.execute_async(
+            tool, operation, kwargs, progress=report if listening else None
+        )
+        return result.to_dict()
+
+    return _make_handler(
+        f"{tool.name}_{operation.name}",
+        _build_docstring(tool, operation),
+        operation,
+        _impl,
+        with_context=True,
+    )
+
+
+def create_submit_function(
+    tool: ToolDescriptor,
+    operation: Operation,
+    jobs: JobManager,
+) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Create the submit variant of an operation, returning a job handle right away."""
+
+    # An operation input named like the parameter keeps its meaning
+    with_priority = all(inp.name != PRIORITY_PARAM for inp in operation.inputs)
+
+    async def _impl(**kwargs: Any) -> dict[str, Any]:
+        priority = kwargs.pop(PRIORITY_PARAM, 0) if with_priority else 0
+        job = jobs.submit(tool, operation, kwargs, priority=priority)
+        return job.to_dict()
+
+    lines = [
+        f"Submit {operation.name} as a background job and return its job_id immediately.",
+        "Poll with job_status or job_wait, then fetch outputs with job_result.",
+    ]
+    if with_priority:
+        lines.append("Jobs waiting for resources start in order of priority, highest first.")
+    lines += ["", _build_docstring(tool, operation)]
+    return _make_handler(
+        f"{tool.name}_{operation.name}_submit",
+        "\n".join(lines),
+        operation,
+        _impl,
+        with_priority=with_priority,
+    )
 
-    func_name = f"{tool.name}_{operation.name}"
 
-    # Build docstring
+def create_sweep_function(
+    tool: ToolDescriptor,
+    operation: Operation,
+    executor: ToolExecutor,
+) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Create the sweep variant of an operation, running it over a grid of inputs."""
+
+    async def sweep_func(
+        grid: dict[str, Any],
+        mode: SweepMode = "cartesian",
+        samples: Optional[int] = None,
+        max_concurrency: int = 4,
+        fixed: Optional[dict[str, Any]] = None,
+        seed: Optional[int] = None,
+    ) -> dict[str, Any]:
+        try:
+            return await run_sweep(
+                executor,
+                tool,
+                operation,
+                grid,
+                mode=mode,
+                samples=samples,
+                max_concurrency=max_concurrency,
+                fixed=fixed,
+                seed=seed,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            return {"error": f"Invalid sweep: {e}"}
+
+    lines = [
+        f"Run {operation.name} once per point of a parameter grid and return one table.",
+        "",
+        "grid maps input names to a list of values, {start, stop, step} or",
+        "{start, stop, num}; for latin_hypercube also {min, max}.",
+        "mode: cartesian (all combinations), zip (element-wise) or latin_hypercube",
+        "(needs samples). fixed holds inputs shared by all points. At most",
+        "max_concurrency points run at once.",
+        "",
+        _build_docstring(tool, operation),
+    ]
+    sweep_func.__name__ = f"{tool.name}_{operation.name}_sweep"
+    sweep_func.__doc__ = "\n".join(lines)
+    return sweep_func
+
+
+def _build_docstring(tool: ToolDescriptor, operation: Operation) -> str:
     lines = [operation.description, "", f"Tool: {tool.name}", f"Operation: {operation.name}", ""]
     if operation.inputs:
         lines.append("Parameters:")
         for inp in operation.inputs:
             req_str = "required" if inp.required else f"optional, default={inp.default}"
             lines.append(f"    {inp.name} ({inp.type}, {req_str}): {inp.description}")
-    docstring = "\n".join(lines)
+    return "\n".join(lines)
 
-    # Create the underlying implementation function
-    def _impl(**kwargs: Any) -> dict[str, Any]:
-        result = executor.execute(tool, operation, kwargs)
-        return result.to_dict()
 
-    if not operation.inputs:
+def _make_handler(
+    func_name: str,
+    docstring: str,
+    operation: Operation,
+    impl: Callable[..., Awaitable[dict[str, Any]]],
+    with_context: bool = False,
+    with_priority: bool = False,
+) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Wrap impl in a handler whose signature mirrors the operation inputs.
+
+    with_context adds a CONTEXT_PARAM parameter that FastMCP fills with the
+    request Context; it is not part of the tool's input schema. with_priority
+    adds an optional integer PRIORITY_PARAM.
+    """
+    if not operation.inputs and not with_context and not with_priority:
         # No inputs - simple function
-        def tool_func() -> dict[str, Any]:
+        async def tool_func() -> dict[str, Any]:
             """No inputs."""
-            return _impl()
+            return await impl()
 
         tool_func.__name__ = func_name
         tool_func.__doc__ = docstring
@@ -65,42 +202,158 @@ def create_tool_function(
         )
         params.append(param)
 
-    sig = inspect.Signature(params)
+    if with_priority:
+        params.append(
+            inspect.Parameter(
+                PRIORITY_PARAM, inspect.Parameter.KEYWORD_ONLY, default=0, annotation=int
+            )
+        )
+
+    if with_context:
+        params.append(
+            inspect.Parameter(
+                CONTEXT_PARAM, inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Context
+            )
+        )
 
-    # Create a generic handler that routes to _impl
-    def make_handler(input_names: list[str]) -> Callable[..., dict[str, Any]]:
-        def handler(**kwargs: Any) -> dict[str, Any]:
-            return _impl(**kwargs)
+    sig = inspect.Signature(params)
 
-        return handler
+    # Create a generic handler that routes to impl
+    async def handler(**kwargs: Any) -> dict[str, Any]:
+        return await impl(**kwargs)
 
-    handler = make_handler([inp.name for inp in operation.inputs])
     setattr(handler, "__signature__", sig)
+    # Schema generation resolves annotations by name, not from the signature
+    handler.__annotations__ = {
+        param.name: param.annotation
+        for param in params
+        if param.annotation is not inspect.Parameter.empty
+    }
     handler.__name__ = func_name
     handler.__doc__ = docstring
 
     return handler
 
 
-def create_server(tools_dir: Path) -> FastMCP:
+@dataclass
+class ServerConfig:
+    """Server-wide settings, filled from the command line."""
+
+    runs_dir: Path = Path("./runs")
+    cache: bool = True
+
+    # Run conda tools in a captured activated environment instead of activating per run
+    env_snapshots: bool = True
+
+    # Validated descriptors kept between starts; None disables
+    descriptor_cache_dir: Optional[Path] = None
+
+    # Default slots per parallel operation; None means CPU count
+    max_parallel: Optional[int] = None
+
+    # Host capacity for operations declaring resources; None means detect
+    cpus: Optional[float] = None
+    memory_mb: Optional[float] = None
+
+    # Run directory eviction; no sweeper runs unless a limit is set
+    max_disk_bytes: Optional[int] = None
+    max_run_age: Optional[float] = None
+    eviction_policy: EvictionPolicy = "lru"
+    sweep_interval: float = 600.0
+
+    # Larger catalogs register per-operation tools only on demand (load_operation)
+    eager_tool_limit: int = 200
+
+    # Reload changed tool descriptors without a restart
+    watch_tools: bool = False
+    watch_interval: float = 2.0
+
+    # Seconds a stopped run's processes get between SIGTERM and SIGKILL
+    kill_grace: float = KILL_GRACE_PERIOD
+
+    # Seconds between sweeps for processes that outlived their run; None disables
+    reap_interval: Optional[float] = 60.0
+
+
+def create_server(tools_dir: Path, config: Optional[ServerConfig] = None) -> FastMCP:
     """Create and configure MCP server."""
+    config = config or ServerConfig()
 
     # Load tools
-    registry = ToolRegistry(tools_dir)
+    registry = ToolRegistry(tools_dir, cache_dir=config.descriptor_cache_dir)
     registry.load_all()
 
-    # Create executor
-    executor = ToolExecutor()
+    # Create executor and background job tracking
+    result_cache = ResultCache(config.runs_dir / ".cache") if config.cache else None
+    run_index = RunIndex(config.runs_dir / ".index.sqlite")
+    executor = ToolExecutor(
+        config.runs_dir,
+        cache=result_cache,
+        max_parallel=config.max_parallel,
+        cpus=config.cpus,
+        memory_mb=config.memory_mb,
+        run_index=run_index,
+        env_snapshots=config.env_snapshots,
+        kill_grace=config.kill_grace,
+    )
+    jobs = JobManager(executor)
+
+    # Processes that escaped their run's process group
+    if config.reap_interval:
+        OrphanReaper(config.runs_dir, grace=config.kill_grace).start(config.reap_interval)
+
+    # Keep run directories within disk limits
+    tool_quotas = _tool_quotas(registry)
+    eviction = EvictionManager(
+        config.runs_dir,
+        max_bytes=config.max_disk_bytes,
+        max_age=config.max_run_age,
+        policy=config.eviction_policy,
+        tool_quotas=tool_quotas,
+        cache=result_cache,
+    )
+    if config.max_disk_bytes is not None or config.max_run_age is not None or tool_quotas:
+        eviction.start(config.sweep_interval)
+
+    # Started with the server loop when descriptors are watched
+    watcher: Optional[DescriptorWatcher] = None
+    server_loop: Optional[asyncio.AbstractEventLoop] = None
+    # Sessions to tell about tool list changes, recorded as they make requests
+    sessions = _SessionTracker()
+
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        nonlocal server_loop
+        server_loop = asyncio.get_running_loop()
+        if watcher is not None:
+            watcher.start()
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                # In a thread: the watcher may be waiting for this loop to apply a change
+                await asyncio.to_thread(watcher.stop)
+            server_loop = None
 
     # Create MCP server
-    mcp = FastMCP("scipilot")
+    mcp = FastMCP("scipilot", lifespan=lifespan, middleware=[sessions])
+
+    index = ToolIndex(registry.list_tools())
+    lazy = len(index) > config.eager_tool_limit
 
     # Add introspection tools
     @mcp.tool()
-    def list_available_tools() -> list[dict[str, Any]]:
-        """List all available tools and their operations."""
+    def list_available_tools(
+        limit: Optional[int] = None, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        """List available tools and their operations (a page of them if limit is set).
+
+        For large catalogs prefer search_tools.
+        """
+        tools = registry.list_tools()
+        end = None if limit is None else offset + limit
         result = []
-        for tool in registry.list_tools():
+        for tool in tools[offset:end]:
             result.append(
                 {
                     "name": tool.name,
@@ -120,43 +373,313 @@ def create_server(tools_dir: Path) -> FastMCP:
         if not tool:
             return {"error": f"Tool not found: {tool_name}"}
 
-        operation = next((op for op in tool.operations if op.name == operation_name), None)
+        operation = registry.get_operation(tool_name, operation_name)
         if not operation:
             return {"error": f"Operation not found: {operation_name}"}
 
+        return _operation_details(tool, operation)
+
+    @mcp.tool()
+    def search_tools(query: str, limit: int = 20, offset: int = 0) -> dict[str, Any]:
+        """Find operations by keywords, best matches first.
+
+        Matches tool and operation names, input names and descriptions; words
+        of 3+ letters also match longer words they start. Pass next_offset
+        back as offset for the next page.
+        """
+        offset = max(0, offset)
+        total, hits = index.search(query, limit=max(1, min(limit, 100)), offset=offset)
+        next_offset = offset + len(hits)
         return {
-            "tool": tool_name,
-            "operation": operation_name,
-            "description": operation.description,
-            "inputs": [
-                {
-                    "name": inp.name,
-                    "type": inp.type,
-                    "required": inp.required,
-                    "description": inp.description,
-                    "default": inp.default,
-                }
-                for inp in operation.inputs
-            ],
-            "outputs": [
-                {
-                    "name": out.name,
-                    "type": out.type,
-                    "description": out.description,
-                }
-                for out in operation.outputs
-            ],
+            "total": total,
+            "results": [hit.to_dict() for hit in hits],
+            "next_offset": next_offset if next_offset < total else None,
+            "lazy": lazy,
         }
 
-    # Dynamically add tools from registry
-    for tool in registry.list_tools():
-        for operation in tool.operations:
-            tool_func = create_tool_function(tool, operation, executor)
-            mcp.tool(name=tool_func.__name__)(tool_func)
+    # Job tools for submitted operations
+    @mcp.tool()
+    def job_status(job_id: str) -> dict[str, Any]:
+        """Get the status of a submitted job without waiting."""
+        job = jobs.get(job_id)
+        if not job:
+            return {"error": f"Job not found: {job_id}"}
+        return job.to_dict()
+
+    @mcp.tool()
+    async def job_wait(job_id: str, timeout: float = 60.0) -> dict[str, Any]:
+        """Wait up to timeout seconds for a job to finish, then return its status.
+
+        Includes the result when the job finished within the timeout.
+        """
+        job = await jobs.wait(job_id, timeout)
+        if not job:
+            return {"error": f"Job not found: {job_id}"}
+        status = job.to_dict()
+        if job.result is not None:
+            status["result"] = job.result.to_dict()
+        return status
+
+    @mcp.tool()
+    def job_result(job_id: str) -> dict[str, Any]:
+        """Get the result of a finished job (outputs, return code, stderr preview)."""
+        job = jobs.get(job_id)
+        if not job:
+            return {"error": f"Job not found: {job_id}"}
+        if not job.done:
+            return {"error": f"Job not finished: {job_id}", "status": job.status}
+        if job.result is None:
+            return {"error": job.error or f"Job {job.status}", "status": job.status}
+        return job.result.to_dict()
+
+    @mcp.tool()
+    def job_cancel(job_id: str) -> dict[str, Any]:
+        """Cancel a pending or running job and kill its process."""
+        job = jobs.get(job_id)
+        if not job:
+            return {"error": f"Job not found: {job_id}"}
+        cancelled = jobs.cancel(job_id)
+        return {"job_id": job_id, "cancelled": cancelled, "status": job.status}
+
+    @mcp.tool()
+    def query_runs(
+        tool_name: Optional[str] = None,
+        operation_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        status: Optional[str] = None,
+        inputs: Optional[dict[str, Any]] = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        """Search past runs, newest first.
+
+        since/until are ISO timestamps (e.g. "2025-01-31T00:00"). status is one of
+        running, succeeded, failed, cancelled. inputs maps input names to an exact
+        value or a {"min": x, "max": y} range, e.g. {"temperature": {"min": 290}}.
+        """
+        try:
+            return run_index.query(
+                tool=tool_name,
+                operation=operation_name,
+                since=since,
+                until=until,
+                status=status,
+                inputs=inputs,
+                limit=limit,
+            )
+        except ValueError as e:
+            return [{"error": f"Invalid query: {e}"}]
+
+    # Run retention
+    @mcp.tool()
+    def pin_run(run_id: str, pinned: bool = True) -> dict[str, Any]:
+        """Protect a run directory from eviction (pinned=False removes the protection)."""
+        run_dir = _resolve_run_dir(config.runs_dir, run_id)
+        if run_dir is None:
+            return {"error": f"Run not found: {run_id}"}
+        eviction.pin(run_dir, pinned)
+        return {"run_id": run_id, "pinned": pinned}
+
+    # Dynamically add tools from registry; (tool, operation) -> registered MCP tool names
+    registered: dict[tuple[str, str], list[str]] = {}
+
+    def register(tool: ToolDescriptor, operation: Operation) -> list[str]:
+        names = registered.get((tool.name, operation.name))
+        if names is None:
+            names = _register_operation(mcp, tool, operation, executor, jobs)
+            registered[(tool.name, operation.name)] = names
+        return names
+
+    if lazy:
+
+        # Async so it runs on the server loop, like every change to the registrations
+        @mcp.tool()
+        async def load_operation(tool_name: str, operation_name: str) -> dict[str, Any]:
+            """Make an operation callable: registers its run, submit and sweep tools.
+
+            The catalog is too large to register every operation up front; find
+            operations with search_tools, then load the ones you need.
+            """
+            tool = registry.get(tool_name)
+            if not tool:
+                return {"error": f"Tool not found: {tool_name}"}
+            operation = registry.get_operation(tool_name, operation_name)
+            if not operation:
+                return {"error": f"Operation not found: {operation_name}"}
+            names = register(tool, operation)
+            # Clients only call tools they have listed; tell them to list again
+            await sessions.notify_tool_list_changed()
+            return {"tools": names, **_operation_details(tool, operation)}
+
+    else:
+        for tool in registry.list_tools():
+            for operation in tool.operations:
+                register(tool, operation)
+
+    if config.watch_tools:
+        # Lazily loaded operations that stay loaded across an update
+        reload: set[tuple[str, str]] = set()
+
+        def apply_changes(changes: RegistryChanges) -> None:
+            # Running calls and jobs keep the descriptor they started with
+            for name in changes.removed + changes.updated:
+                index.remove_tool(name)
+                for key in [key for key in registered if key[0] == name]:
+                    for func_name in registered.pop(key):
+                        _remove_mcp_tool(mcp, func_name)
+                    if name in changes.updated:
+                        reload.add(key)
+            for name in changes.added + changes.updated:
+                tool = registry.get(name)
+                if tool is None:
+                    continue
+                index.add_tool(tool)
+                for operation in tool.operations:
+                    if not lazy or (name, operation.name) in reload:
+                        register(tool, operation)
+            reload.clear()
+            eviction.tool_quotas = _tool_quotas(registry)
+
+        async def swap(changes: RegistryChanges) -> None:
+            # No await before the swap is done: calls never see a half-updated tool
+            apply_changes(changes)
+            await sessions.notify_tool_list_changed()
+
+        def on_change(changes: RegistryChanges) -> None:
+            loop = server_loop
+            if loop is None:
+                # Not serving: nothing else touches the registrations
+                apply_changes(changes)
+                return
+            # FastMCP's tool tables belong to the server loop; swap them there
+            asyncio.run_coroutine_threadsafe(swap(changes), loop).result()
+
+        watcher = DescriptorWatcher(registry, on_change, interval=config.watch_interval)
 
     return mcp
 
 
+def _operation_details(tool: ToolDescriptor, operation: Operation) -> dict[str, Any]:
+    return {
+        "tool": tool.name,
+        "operation": operation.name,
+        "description": operation.description,
+        "inputs": [
+            {
+                "name": inp.name,
+                "type": inp.type,
+                "required": inp.required,
+                "description": inp.description,
+                "default": inp.default,
+            }
+            for inp in operation.inputs
+        ],
+        "outputs": [
+            {
+                "name": out.name,
+                "type": out.type,
+                "description": out.description,
+            }
+            for out in operation.outputs
+        ],
+    }
+
+
+def _register_operation(
+    mcp: FastMCP,
+    tool: ToolDescriptor,
+    operation: Operation,
+    executor: ToolExecutor,
+    jobs: JobManager,
+) -> list[str]:
+    """Add the run, submit and sweep MCP tools of an operation and return their names."""
+    tool_func = create_tool_function(tool, operation, executor)
+    mcp.tool(name=tool_func.__name__)(tool_func)
+    submit_func = create_submit_function(tool, operation, jobs)
+    mcp.tool(name=submit_func.__name__)(submit_func)
+    sweep_func = create_sweep_function(tool, operation, executor)
+    mcp.tool(name=sweep_func.__name__)(sweep_func)
+    return [tool_func.__name__, submit_func.__name__, sweep_func.__name__]
+
+
+def _progress_requested(ctx: Context) -> bool:
+    """Whether the request carries a progressToken, i.e. the client wants progress."""
+    try:
+        request = ctx.request_context
+    except (LookupError, RuntimeError, ValueError):
+        return False  # not inside a request
+    meta = getattr(request, "meta", None)
+    if isinstance(meta, Mapping):
+        # Newer FastMCP lifts the raw _meta block
+        return meta.get("progressToken") is not None
+    return getattr(meta, "progressToken", None) is not None
+
+
+def _remove_mcp_tool(mcp: FastMCP, name: str) -> None:
+    remove: Callable[[str], None]
+    if hasattr(mcp, "local_provider"):
+        # Newer FastMCP keeps locally defined tools in a provider
+        remove = mcp.local_provider.remove_tool
+    else:
+        remove = getattr(mcp, "remove_tool")
+    try:
+        remove(name)
+    except Exception:
+        pass  # already gone
+
+
+class _SessionTracker(Middleware):
+    """Remember the sessions of incoming requests, to notify them of changes later.
+
+    Only the most recently active sessions are kept: sessionless (2026-07-28)
+    clients look like a new session per request and cannot be notified anyway.
+    """
+
+    MAX_SESSIONS = 256
+
+    def __init__(self) -> None:
+        self._sessions: OrderedDict[str, ServerSession] = OrderedDict()
+
+    async def on_message(
+        self, context: MiddlewareContext[Any], call_next: CallNext[Any, Any]
+    ) -> Any:
+        ctx = context.fastmcp_context
+        if ctx is not None:
+            try:
+                key, session = ctx.session_id, ctx.session
+            except (AttributeError, RuntimeError):
+                pass  # no session, e.g. a call made in-process
+            else:
+                self._sessions[key] = session
+                self._sessions.move_to_end(key)
+                while len(self._sessions) > self.MAX_SESSIONS:
+                    self._sessions.popitem(last=False)
+        return await call_next(context)
+
+    async def notify_tool_list_changed(self) -> None:
+        for key, session in list(self._sessions.items()):
+            try:
+                await session.send_tool_list_changed()
+            except Exception:
+                self._sessions.pop(key, None)  # closed
+
+
+def _tool_quotas(registry: ToolRegistry) -> dict[str, int]:
+    return {
+        tool.name: int(tool.tool.disk_quota_mb * 1024 * 1024)
+        for tool in registry.list_tools()
+        if tool.tool.disk_quota_mb is not None
+    }
+
+
+def _resolve_run_dir(runs_dir: Path, run_id: str) -> Optional[Path]:
+    """Map a run_id to its directory, refusing paths outside runs_dir."""
+    run_dir = resolve_run_dir(runs_dir, run_id)
+    if run_dir is None or not run_dir.resolve().is_relative_to(runs_dir.resolve()):
+        return None
+    return run_dir
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="SciPilot - MCP for Scientific CLI Tools")
     parser.add_argument(
@@ -168,9 +691,90 @@ def main() -> None:
     parser.add_argument(
         "--transport", choices=["stdio", "sse"], default="stdio", help="MCP transport mode"
     )
+    parser.add_argument(
+        "--runs-dir", type=Path, default=Path("./runs"), help="Base directory for tool runs"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always rerun operations instead of reusing results of identical runs",
+    )
+    parser.add_argument(
+        "--no-env-snapshots",
+        action="store_true",
+        help="Activate conda environments for every run instead of reusing a captured one",
+    )
+    parser.add_argument(
+        "--no-descriptor-cache",
+        action="store_true",
+        help="Parse and validate every tool descriptor at startup instead of reusing cached ones",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        help="Concurrent runs per parallel operation without max_parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cpus", type=float, help="CPU cores available to scheduled runs (default: all)"
+    )
+    parser.add_argument(
+        "--memory-mb", type=float, help="Memory available to scheduled runs (default: all)"
+    )
+    parser.add_argument(
+        "--max-disk-gb", type=float, help="Evict old runs when run directories exceed this size"
+    )
+    parser.add_argument(
+        "--max-run-age-days", type=float, help="Evict runs not used for this many days"
+    )
+    parser.add_argument(
+        "--eviction-policy", choices=["lru", "lfu"], default="lru", help="Which runs go first"
+    )
+    parser.add_argument(
+        "--sweep-interval", type=float, default=600.0, help="Seconds between eviction sweeps"
+    )
+    parser.add_argument(
+        "--eager-tool-limit",
+        type=int,
+        default=200,
+        help="Above this many operations, register operation tools on demand (load_operation)",
+    )
+    parser.add_argument(
+        "--watch-tools",
+        action="store_true",
+        help="Reload tool descriptors when files in --tools-dir change, without a restart",
+    )
+    parser.add_argument(
+        "--kill-grace",
+        type=float,
+        default=KILL_GRACE_PERIOD,
+        help="Seconds a timed-out or cancelled run gets after SIGTERM before SIGKILL",
+    )
+    parser.add_argument(
+        "--reap-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between sweeps for processes left by finished runs (0 disables)",
+    )
     args = parser.parse_args()
 
-    mcp = create_server(args.tools_dir)
+    config = ServerConfig(
+        runs_dir=args.runs_dir,
+        cache=not args.no_cache,
+        env_snapshots=not args.no_env_snapshots,
+        descriptor_cache_dir=None if args.no_descriptor_cache else default_cache_dir(),
+        max_parallel=args.max_parallel,
+        cpus=args.cpus,
+        memory_mb=args.memory_mb,
+        max_disk_bytes=int(args.max_disk_gb * 1024**3) if args.max_disk_gb else None,
+        max_run_age=args.max_run_age_days * 86400 if args.max_run_age_days else None,
+        eviction_policy=args.eviction_policy,
+        sweep_interval=args.sweep_interval,
+        eager_tool_limit=args.eager_tool_limit,
+        watch_tools=args.watch_tools,
+        kill_grace=args.kill_grace,
+        reap_interval=args.reap_interval,
+    )
+    mcp = create_server(args.tools_dir, config)
     mcp.run(transport=args.transport)
 
 
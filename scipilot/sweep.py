@@ -0,0 +1,197 @@
+"""Parameter sweeps: fan one operation over a grid of inputs."""
+
+from __future__ import annotations
+import asyncio
+import itertools
+import math
+import random
+from typing import Any, Literal, Optional
+
+from .executor import ExecutionResult, ToolExecutor
+from .models import InputSpec, Operation, ToolDescriptor
+
+SweepMode = Literal["cartesian", "zip", "latin_hypercube"]
+
+MAX_SWEEP_POINTS = 1000
+
+
+def expand_values(spec: Any) -> list[Any]:
+    """Expand one grid entry into a list of values.
+
+    Accepts a list, a range {"start", "stop", "step"} (stop inclusive), a
+    linspace {"start", "stop", "num"}, or a single scalar.
+    """
+    if isinstance(spec, list):
+        return spec
+    return [value_at(spec, index) for index in range(axis_length(spec))]
+
+
+def value_at(spec: Any, index: int) -> Any:
+    """The index-th value expand_values would yield, computed without the list."""
+    if isinstance(spec, list):
+        return spec[index]
+    if not isinstance(spec, dict):
+        return spec
+    start, stop = spec["start"], spec["stop"]
+    if "num" in spec:
+        count = axis_length(spec)
+        return start if count < 2 else start + index * ((stop - start) / (count - 1))
+    return start + index * spec.get("step", 1)
+
+
+def axis_length(spec: Any) -> int:
+    """Number of values expand_values yields for a grid entry, without building them."""
+    if isinstance(spec, list):
+        return len(spec)
+    if not isinstance(spec, dict):
+        return 1
+    if "num" in spec:
+        return max(1, int(spec["num"]))
+    start, stop = spec["start"], spec["stop"]
+    step = spec.get("step", 1)
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError(f"Invalid range: {spec}")
+    span = (stop - start) / step
+    if not math.isfinite(span):
+        raise ValueError(f"Invalid range: {spec}")
+    return int(span + 1e-9) + 1
+
+
+def count_points(
+    grid: dict[str, Any], mode: SweepMode = "cartesian", samples: Optional[int] = None
+) -> int:
+    """Number of points build_points would produce, computed from the axis lengths.
+
+    Raises ValueError for grids that cannot be built, so callers can check
+    the size before any value list is materialized.
+    """
+    if mode == "latin_hypercube":
+        if not samples or samples < 1:
+            raise ValueError("latin_hypercube mode requires samples >= 1")
+        for spec in grid.values():
+            if not (isinstance(spec, dict) and "min" in spec and "max" in spec):
+                axis_length(spec)
+        return samples
+    lengths = [axis_length(spec) for spec in grid.values()]
+    if mode == "zip":
+        if len(set(lengths)) > 1:
+            raise ValueError(
+                f"zip mode needs equally long value lists, got lengths {set(lengths)}"
+            )
+        return lengths[0] if lengths else 0
+    if mode == "cartesian":
+        return math.prod(lengths)
+    raise ValueError(f"Unknown sweep mode: {mode}")
+
+
+def build_points(
+    grid: dict[str, Any],
+    mode: SweepMode = "cartesian",
+    samples: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Turn a grid specification into a list of input dicts."""
+    names = list(grid)
+
+    if mode == "cartesian":
+        axes = [expand_values(grid[name]) for name in names]
+        return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+    if mode == "zip":
+        axes = [expand_values(grid[name]) for name in names]
+        lengths = {len(axis) for axis in axes}
+        if len(lengths) > 1:
+            raise ValueError(f"zip mode needs equally long value lists, got lengths {lengths}")
+        return [dict(zip(names, combo)) for combo in zip(*axes)]
+
+    if mode == "latin_hypercube":
+        if not samples or samples < 1:
+            raise ValueError("latin_hypercube mode requires samples >= 1")
+        return _latin_hypercube(grid, samples, random.Random(seed))
+
+    raise ValueError(f"Unknown sweep mode: {mode}")
+
+
+def _latin_hypercube(
+    grid: dict[str, Any], samples: int, rng: random.Random
+) -> list[dict[str, Any]]:
+    """One stratum per sample along every axis, strata shuffled independently.
+
+    Continuous axes are given as {"min", "max"}; anything else is sampled by
+    stratified index into its values.
+    """
+    points: list[dict[str, Any]] = [{} for _ in range(samples)]
+    for name, spec in grid.items():
+        strata = list(range(samples))
+        rng.shuffle(strata)
+        if isinstance(spec, dict) and "min" in spec and "max" in spec:
+            low, high = spec["min"], spec["max"]
+            for point, stratum in zip(points, strata):
+                point[name] = low + (stratum + rng.random()) / samples * (high - low)
+        else:
+            # Index into the axis; a range may be far too long to expand
+            length = axis_length(spec)
+            for point, stratum in zip(points, strata):
+                index = int((stratum + rng.random()) / samples * length)
+                point[name] = value_at(spec, min(index, length - 1))
+    return points
+
+
+async def run_sweep(
+    executor: ToolExecutor,
+    tool: ToolDescriptor,
+    operation: Operation,
+    grid: dict[str, Any],
+    mode: SweepMode = "cartesian",
+    samples: Optional[int] = None,
+    max_concurrency: int = 4,
+    fixed: Optional[dict[str, Any]] = None,
+    seed: Optional[int] = None,
+) -> dict[str, Any]:
+    """Run operation once per grid point, at most max_concurrency at a time.
+
+    Returns a table with one row per point: the swept inputs, success, the
+    extracted outputs and the run_id.
+    """
+    specs = {inp.name: inp for inp in operation.inputs}
+    unknown = sorted(set(grid) - set(specs))
+    if unknown:
+        raise ValueError(f"Unknown inputs for {operation.name}: {', '.join(unknown)}")
+
+    size = count_points(grid, mode, samples)
+    if size > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep has {size} points, limit is {MAX_SWEEP_POINTS}")
+    points = build_points(grid, mode, samples, seed)
+    points = [_coerce(point, specs) for point in points]
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_point(point: dict[str, Any]) -> ExecutionResult:
+        async with semaphore:
+            return await executor.execute_async(tool, operation, {**(fixed or {}), **point})
+
+    results = await asyncio.gather(*(run_point(point) for point in points))
+
+    input_names = list(grid)
+    output_names = [out.name for out in operation.outputs]
+    rows = [
+        [point[name] for name in input_names]
+        + [result.success]
+        + [result.outputs.get(name) for name in output_names]
+        + [result.run_id]
+        for point, result in zip(points, results)
+    ]
+    return {
+        "columns": input_names + ["success"] + output_names + ["run_id"],
+        "rows": rows,
+        "points": len(rows),
+        "failed": sum(1 for result in results if not result.success),
+    }
+
+
+def _coerce(point: dict[str, Any], specs: dict[str, InputSpec]) -> dict[str, Any]:
+    """Round sampled values for integer inputs."""
+    return {
+        name: round(value) if specs[name].type == "integer" and isinstance(value, float) else value
+        for name, value in point.items()
+    }
@@ -1,62 +1,346 @@
 """Load and manage tool descriptors from YAML files."""
 
 from __future__ import annotations
+import functools
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional, Union
 
 import yaml
 
-from .models import ToolDescriptor
+from .log import log
+from .models import Operation, ToolDescriptor
+from .plan import compile_operation
 
 
 MAX_YAML_SIZE = 1024 * 1024  # 1MB - protect against YAML bombs
 
+# Bump when plan or cache entry structure changes; model changes are caught by the schema hash
+DESCRIPTOR_CACHE_VERSION = 3
+
+# Below this many uncached descriptors, starting worker processes costs more than it saves
+PARALLEL_LOAD_MIN_FILES = 16
+
+# libyaml-backed loader when available, pure Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def default_cache_dir() -> Path:
+    """Per-user descriptor cache location ($XDG_CACHE_HOME/scipilot/descriptors)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "scipilot" / "descriptors"
+
+
+@dataclass
+class RegistryChanges:
+    """Tool names affected by ToolRegistry.refresh."""
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
 
 class ToolRegistry:
     """Registry of loaded tool descriptors."""
 
-    def __init__(self, tools_dir: Union[Path, str]):
+    def __init__(
+        self,
+        tools_dir: Union[Path, str],
+        cache_dir: Optional[Union[Path, str]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """cache_dir, if given, stores validated descriptors between starts.
+
+        max_workers bounds the process pool used to parse descriptors
+        (default: CPU count, at most 8).
+
+        Entries are pickles, so cache_dir must only be writable by the user.
+        """
         self.tools_dir = Path(tools_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
         self._tools: dict[str, ToolDescriptor] = {}
+        # Lookup map and listings derived from _tools, rebuilt by _publish
+        self._operations: dict[tuple[str, str], Operation] = {}
+        self._tool_list: tuple[ToolDescriptor, ...] = ()
+        self._operation_list: tuple[tuple[str, str], ...] = ()
+        # path -> ((mtime_ns, size) when last loaded, tool name or None if invalid)
+        self._files: dict[Path, tuple[tuple[int, int], Optional[str]]] = {}
 
     def load_all(self) -> dict[str, ToolDescriptor]:
-        """Load all YAML files from tools directory."""
-        self._tools = {}
+        """Load all YAML files from tools directory.
+
+        Descriptors missing from the cache are read, parsed and validated on a
+        process pool once there are enough of them to pay for the workers.
+        """
+        self._publish({})
+        self._files = {}
 
         if not self.tools_dir.exists():
             print(f"Warning: Tools directory not found: {self.tools_dir}")
             return self._tools
 
-        for yaml_file in self.tools_dir.glob("*.yaml"):
+        # Taken before loading, so a file edited meanwhile is picked up by refresh()
+        snapshot = self._snapshot()
+        results: dict[Path, Union[ToolDescriptor, str]] = {}
+        pending: list[tuple[Path, Optional[dict[str, Any]]]] = []
+        yaml_files = sorted(self.tools_dir.glob("*.yaml"))
+        for yaml_file in yaml_files:
             try:
-                tool = self._load_file(yaml_file)
-                self._tools[tool.name] = tool
-                print(f"Loaded tool: {tool.name}")
+                tool, entry = self._cached_tool(yaml_file)
             except Exception as e:
-                print(f"Error loading {yaml_file}: {e}")
+                results[yaml_file] = str(e)
+                continue
+            if tool is not None:
+                results[yaml_file] = tool
+            else:
+                pending.append((yaml_file, entry))
+
+        for (yaml_file, entry), loaded in zip(pending, self._load_pending(pending)):
+            if isinstance(loaded, str):
+                results[yaml_file] = loaded
+                continue
+            stat, digest, tool = loaded
+            if tool is None:
+                # Touched but not changed
+                assert entry is not None
+                tool = entry["tool"]
+            self._cache_put(yaml_file, stat, digest, tool)
+            results[yaml_file] = tool
+
+        tools: dict[str, ToolDescriptor] = {}
+        for yaml_file in yaml_files:
+            result = results[yaml_file]
+            if isinstance(result, str):
+                print(f"Error loading {yaml_file}: {result}")
+                name = None
+            else:
+                tools[result.name] = result
+                print(f"Loaded tool: {result.name}")
+                name = result.name
+            if yaml_file in snapshot:
+                self._files[yaml_file] = (snapshot[yaml_file], name)
 
+        self._publish(tools)
         return self._tools
 
+    def refresh(self) -> RegistryChanges:
+        """Re-validate descriptors added, changed or deleted since the last load.
+
+        Unchanged files are not read. A file that no longer validates keeps
+        its previously loaded tool until it is fixed. Messages go to stderr,
+        since refresh runs while the server is serving on stdout.
+        """
+        snapshot = self._snapshot()
+        tools = dict(self._tools)
+        files = dict(self._files)
+        changes = RegistryChanges()
+
+        for path in sorted(set(files) - set(snapshot)):
+            _, name = files.pop(path)
+            if name is not None and name not in {n for _, n in files.values()}:
+                tools.pop(name, None)
+                changes.removed.append(name)
+                log(f"Removed tool: {name}")
+
+        for path, signature in sorted(snapshot.items()):
+            previous = files.get(path)
+            if previous is not None and previous[0] == signature:
+                continue
+            old_name = previous[1] if previous else None
+            try:
+                tool = self._load_file(path)
+            except Exception as e:
+                log(f"Error loading {path}: {e}")
+                files[path] = (signature, old_name)
+                continue
+
+            files[path] = (signature, tool.name)
+            if old_name is not None and old_name != tool.name:
+                tools.pop(old_name, None)
+                changes.removed.append(old_name)
+            if tool.name in tools:
+                changes.updated.append(tool.name)
+            else:
+                changes.added.append(tool.name)
+            tools[tool.name] = tool
+            log(f"Reloaded tool: {tool.name}")
+
+        # Swap whole dicts so concurrent readers never see a half-applied refresh
+        self._files = files
+        if changes:
+            self._publish(tools)
+        return changes
+
+    def _publish(self, tools: dict[str, ToolDescriptor]) -> None:
+        """Install a new set of tools with their lookup map and listings."""
+        operations = {
+            (tool.name, op.name): op for tool in tools.values() for op in tool.operations
+        }
+        self._operations = operations
+        self._tool_list = tuple(tools.values())
+        self._operation_list = tuple(operations)
+        self._tools = tools
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for path in self.tools_dir.glob("*.yaml"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # deleted while listing
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _load_pending(
+        self, pending: list[tuple[Path, Optional[dict[str, Any]]]]
+    ) -> list[Union[_Loaded, str]]:
+        """Load descriptors the cache could not answer, in order."""
+        args = [(path, entry["sha256"] if entry else None) for path, entry in pending]
+        workers = min(self.max_workers, len(args))
+        if workers > 1 and len(args) >= PARALLEL_LOAD_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    return list(pool.map(_load_descriptor, *zip(*args), chunksize=4))
+            except (OSError, BrokenProcessPool) as e:
+                log(f"Warning: parallel descriptor loading failed ({e}), loading serially")
+        return [_load_descriptor(path, sha256) for path, sha256 in args]
+
     def _load_file(self, path: Path) -> ToolDescriptor:
-        """Parse single YAML file."""
-        if path.stat().st_size > MAX_YAML_SIZE:
-            raise ValueError(f"YAML file too large ({path.stat().st_size} bytes): {path}")
-        with open(path) as f:
-            data: Any = yaml.safe_load(f)
-        return ToolDescriptor(**data)
+        """Parse single YAML file, or reuse its cached descriptor if unchanged."""
+        tool, entry = self._cached_tool(path)
+        if tool is not None:
+            return tool
+
+        loaded = _load_descriptor(path, entry["sha256"] if entry else None)
+        if isinstance(loaded, str):
+            raise ValueError(loaded)
+        stat, digest, tool = loaded
+        if tool is None:
+            assert entry is not None
+            tool = entry["tool"]
+        self._cache_put(path, stat, digest, tool)
+        return tool
+
+    def _cached_tool(
+        self, path: Path
+    ) -> tuple[Optional[ToolDescriptor], Optional[dict[str, Any]]]:
+        """Cached descriptor if path is unchanged since it was cached, plus the cache entry."""
+        stat = path.stat()
+        if stat.st_size > MAX_YAML_SIZE:
+            raise ValueError(f"YAML file too large ({stat.st_size} bytes): {path}")
+
+        entry = self._cache_get(path)
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return entry["tool"], entry
+        return None, entry
+
+    def _cache_entry_path(self, path: Path) -> Path:
+        assert self.cache_dir is not None
+        key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+        return self.cache_dir / f"{key}.pickle"
+
+    def _cache_get(self, path: Path) -> Optional[dict[str, Any]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_entry_path(path), "rb") as f:
+                entry: dict[str, Any] = pickle.load(f)
+        except Exception:
+            # Missing, truncated or written by an incompatible version
+            return None
+        if entry.get("version") != (DESCRIPTOR_CACHE_VERSION, _schema_fingerprint()):
+            return None
+        return entry
+
+    def _cache_put(
+        self, path: Path, stat: os.stat_result, digest: str, tool: ToolDescriptor
+    ) -> None:
+        if self.cache_dir is None:
+            return
+        entry = {
+            "version": (DESCRIPTOR_CACHE_VERSION, _schema_fingerprint()),
+            "path": str(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "tool": tool,
+        }
+        try:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_name, self._cache_entry_path(path))
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            # The cache is an optimization only
+            log(f"Warning: could not cache descriptor {path}: {e}")
 
     def get(self, name: str) -> Optional[ToolDescriptor]:
         """Get tool by name."""
         return self._tools.get(name)
 
-    def list_tools(self) -> list[ToolDescriptor]:
+    def get_operation(self, tool_name: str, operation_name: str) -> Optional[Operation]:
+        """Get an operation by tool and operation name."""
+        return self._operations.get((tool_name, operation_name))
+
+    def list_tools(self) -> tuple[ToolDescriptor, ...]:
         """List all loaded tools."""
-        return list(self._tools.values())
+        return self._tool_list
 
-    def list_operations(self) -> list[tuple[str, str]]:
+    def list_operations(self) -> tuple[tuple[str, str], ...]:
         """List (tool_name, operation_name) pairs."""
-        result = []
-        for tool in self._tools.values():
-            for op in tool.operations:
-                result.append((tool.name, op.name))
-        return result
+        return self._operation_list
+
+
+# (stat, sha256, descriptor or None if the content matched the known sha256)
+_Loaded = tuple[os.stat_result, str, Optional[ToolDescriptor]]
+
+
+def _load_descriptor(path: Path, known_sha256: Optional[str]) -> Union[_Loaded, str]:
+    """Read, parse and validate one descriptor; runs in pool workers.
+
+    Errors are returned as messages rather than raised, since not every
+    exception (pydantic's included) survives the trip back from a worker.
+    """
+    try:
+        stat = path.stat()
+        if stat.st_size > MAX_YAML_SIZE:
+            raise ValueError(f"YAML file too large ({stat.st_size} bytes): {path}")
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest == known_sha256:
+            return stat, digest, None
+
+        data: Any = yaml.load(raw, Loader=_YAML_LOADER)
+        tool = ToolDescriptor(**data)
+        # Compile execution plans now, so template errors surface at load time
+        for operation in tool.operations:
+            operation._plan = compile_operation(operation)
+        return stat, digest, tool
+    except Exception as e:
+        return str(e)
+
+
+@functools.lru_cache(maxsize=1)
+def _schema_fingerprint() -> str:
+    """Hash of the descriptor schema, so cached models from older code are not reused."""
+    schema = json.dumps(ToolDescriptor.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()[:16]
@@ -0,0 +1,98 @@
+"""Hot reload of tool descriptors while the server runs."""
+
+from __future__ import annotations
+import threading
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+from .log import log
+from .tool_loader import RegistryChanges, ToolRegistry
+
+watchfiles: Optional[ModuleType]
+try:
+    import watchfiles
+except ImportError:  # optional: pip install scipilot[watch]
+    watchfiles = None
+
+
+class DescriptorWatcher:
+    """Refresh a ToolRegistry whenever its descriptors change.
+
+    Uses filesystem notifications (inotify via watchfiles) when available and
+    stat polling every interval seconds otherwise. on_change is called from the
+    watcher thread with the tools that were added, updated or removed; it
+    must hand the changes to whatever thread owns the state it updates.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        on_change: Callable[[RegistryChanges], None],
+        interval: float = 2.0,
+        use_notify: Optional[bool] = None,
+    ):
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self.use_notify = watchfiles is not None if use_notify is None else use_notify
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> RegistryChanges:
+        """Refresh the registry once and report the changes."""
+        changes = self.registry.refresh()
+        if changes:
+            self.on_change(changes)
+        return changes
+
+    def start(self) -> None:
+        """Watch in a background daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="scipilot-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        # Catch edits made between the initial load and the watch starting
+        self._check_logged()
+        if self.use_notify and watchfiles is not None:
+            try:
+                self._notify_loop()
+                return
+            except Exception as e:
+                # e.g. inotify watch limit reached, or tools_dir missing
+                log(f"File notifications unavailable ({e}), polling")
+        while not self._stop.wait(self.interval):
+            self._check_logged()
+
+    def _notify_loop(self) -> None:
+        assert watchfiles is not None
+
+        def is_descriptor(change: Any, path: str) -> bool:
+            return path.endswith(".yaml")
+
+        for _ in watchfiles.watch(
+            self.registry.tools_dir,
+            watch_filter=is_descriptor,
+            recursive=False,
+            stop_event=self._stop,
+            rust_timeout=int(self.interval * 1000),
+            yield_on_timeout=False,
+        ):
+            self._check_logged()
+
+    def _check_logged(self) -> None:
+        try:
+            self.check()
+        except Exception as e:
+            log(f"Tool reload failed: {e}")
@@ -0,0 +1,138 @@
+"""Persistent worker process for Python tools, started by scipilot.workers.
+
+Runs under the tool environment's own interpreter, which may not have
+scipilot installed, so this file imports nothing from the package and is
+executed by path. Preload modules are given as arguments.
+
+Requests and responses are JSON lines on the process's original stdin and
+stdout. A request runs one script invocation ("script.py args", "-m module
+args" or "-c code args") with its stdout/stderr sent to the run's log files,
+its own working directory and sys.argv. Process state the script changes
+(cwd, environment, sys.argv, sys.path) is restored afterwards; imported
+modules stay loaded, which is the point.
+"""
+
+# Annotations stay unevaluated: tool environments may run older Pythons
+from __future__ import annotations
+import importlib
+import json
+import os
+import runpy
+import sys
+import traceback
+from typing import Any, BinaryIO
+
+
+def main() -> None:
+    # Started by path: the package directory must not shadow the scripts' imports
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+
+    channel_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    channel_out = os.fdopen(os.dup(1), "wb", buffering=0)
+    # Stray reads and prints between calls must not touch the protocol channel
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for module in sys.argv[1:]:
+        importlib.import_module(module)
+    _send(channel_out, {"ready": True, "pid": os.getpid()})
+
+    buffer = b""
+    while True:
+        chunk = channel_in.read(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            return_code = run(json.loads(line))
+            _send(channel_out, {"return_code": return_code, "rss_mb": _rss_mb()})
+
+
+def run(request: dict[str, Any]) -> int:
+    argv = request["argv"]
+    saved_cwd = os.getcwd()
+    saved_environ = dict(os.environ)
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    saved_fds = os.dup(1), os.dup(2)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    out = os.open(request["stdout_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    err = os.open(request["stderr_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(out, 1)
+    os.dup2(err, 2)
+    os.close(out)
+    os.close(err)
+
+    try:
+        os.chdir(request["cwd"])
+        if argv[0] == "-m":
+            sys.argv = [argv[1]] + argv[2:]
+            sys.path.insert(0, os.getcwd())
+            runpy.run_module(argv[1], run_name="__main__", alter_sys=True)
+        elif argv[0] == "-c":
+            sys.argv = ["-c"] + argv[2:]
+            sys.path.insert(0, "")
+            exec(compile(argv[1], "<string>", "exec"), {"__name__": "__main__"})
+        else:
+            sys.argv = list(argv)
+            sys.path.insert(0, os.path.dirname(os.path.abspath(argv[0])))
+            runpy.run_path(argv[0], run_name="__main__")
+        return_code = 0
+    except SystemExit as e:
+        return_code = _exit_code(e.code)
+    except BaseException:
+        traceback.print_exc()
+        return_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        os.close(saved_fds[0])
+        os.close(saved_fds[1])
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+    return return_code
+
+
+def _exit_code(code: object) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _rss_mb() -> float:
+    """Current resident memory, falling back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _send(channel: BinaryIO, message: dict[str, Any]) -> None:
+    channel.write(json.dumps(message).encode() + b"\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Long-lived Python worker processes for tools marked persistent.
+
+A worker is started once per environment and then runs one script call
+after another (see worker_main), so interpreter startup and heavy imports
+are paid once instead of on every run.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import select
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .models import WorkerConfig
+from .processes import signal_group
+
+WORKER_MAIN = Path(__file__).with_name("worker_main.py")
+
+# Seconds a new worker may take to import its preload modules
+STARTUP_TIMEOUT = 120.0
+
+_PYTHON_RE = re.compile(r"^python[0-9.]*$")
+
+
+def is_python(executable: str) -> bool:
+    """Whether an argv[0] names a Python interpreter (python, python3.12, /env/bin/python)."""
+    return bool(_PYTHON_RE.match(os.path.basename(executable)))
+
+
+class WorkerError(RuntimeError):
+    """The worker process died or broke the protocol."""
+
+
+class Worker:
+    """One worker process and its request/response pipe."""
+
+    def __init__(self, python: str, env: Optional[dict[str, str]], preload: list[str]):
+        self.process = subprocess.Popen(
+            [python, str(WORKER_MAIN), *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            # Its own process group, so killing it also stops what the scripts started
+            start_new_session=True,
+            # Its stderr between calls is ours: startup errors show up in the server log
+        )
+        self.calls = 0
+        self.rss_mb = 0.0
+        self._buffer = b""
+        try:
+            self._read(STARTUP_TIMEOUT)
+        except BaseException:
+            self.kill()
+            raise
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def call(
+        self, argv: list[str], cwd: Path, stdout_path: Path, stderr_path: Path, timeout: float
+    ) -> int:
+        """Run one script call and return its exit code.
+
+        Raises subprocess.TimeoutExpired (after killing the worker) on timeout.
+        """
+        request = {
+            "argv": argv,
+            "cwd": str(cwd),
+            "stdout_path": str(stdout_path),
+            "stderr_path": str(stderr_path),
+        }
+        assert self.process.stdin is not None
+        try:
+            self.process.stdin.write(json.dumps(request).encode() + b"\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise WorkerError(f"worker exited: {e}") from None
+
+        try:
+            response = self._read(timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            raise
+        self.calls += 1
+        self.rss_mb = float(response.get("rss_mb", 0.0))
+        return int(response["return_code"])
+
+    def kill(self) -> None:
+        if self.alive:
+            signal_group(self.process.pid, signal.SIGKILL)
+        self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout):
+            if pipe is not None:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+    def _read(self, timeout: float) -> dict[str, Any]:
+        assert self.process.stdout is not None
+        fd = self.process.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.process.args, timeout)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerError(f"worker exited with code {self.process.wait()}")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        message: dict[str, Any] = json.loads(line)
+        return message
+
+
+class WorkerPool:
+    """Idle workers for one interpreter and environment.
+
+    Workers are started on demand and handed back after each call. A worker
+    is retired after config.max_calls calls, once its resident memory passes
+    config.max_rss_mb, or after a failed call. At most config.max_idle stay
+    around between calls.
+    """
+
+    def __init__(self, python: str, env: Optional[dict[str, str]], config: WorkerConfig):
+        self.python = python
+        self.env = env
+        self.config = config
+        self._idle: list[Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def run(
+        self,
+        argv: list[str],
+        cwd: Path,
+        stdout_path: Path,
+        stderr_path: Path,
+        timeout: float,
+        on_acquire: Optional[Callable[[Worker], None]] = None,
+    ) -> int:
+        """Run a call on an idle or new worker. on_acquire sees the worker first (to kill it)."""
+        worker = self._acquire()
+        if on_acquire is not None:
+            on_acquire(worker)
+        healthy = False
+        try:
+            return_code = worker.call(argv, cwd, stdout_path, stderr_path, timeout)
+            healthy = True
+            return return_code
+        finally:
+            self._release(worker, healthy)
+
+    def close(self) -> None:
+        """Stop idle workers; busy ones stop when they are handed back."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+    def _acquire(self) -> Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+        return Worker(self.python, self.env, self.config.preload)
+
+    def _release(self, worker: Worker, healthy: bool) -> None:
+        retire = (
+            not healthy
+            or not worker.alive
+            or worker.calls >= self.config.max_calls
+            or (self.config.max_rss_mb is not None and worker.rss_mb > self.config.max_rss_mb)
+        )
+        with self._lock:
+            if not retire and not self._closed and len(self._idle) < self.config.max_idle:
+                self._idle.append(worker)
+                return
+        worker.kill()
+
+
+class WorkerPools:
+    """One WorkerPool per interpreter, environment and worker settings."""
+
+    def __init__(self) -> None:
+        self._pools: dict[tuple[Any, ...], WorkerPool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, python: str, env: Optional[dict[str, str]], config: WorkerConfig) -> WorkerPool:
+        env_key = tuple(sorted(env.items())) if env is not None else None
+        key = (python, env_key, config.model_dump_json())
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = WorkerPool(python, env, config)
+            return pool
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+def split_python_argv(argv: list[str]) -> Optional[tuple[str, list[str]]]:
+    """Split "python [script | -m mod | -c code] args" into interpreter and call argv.
+
+    None if argv is not a plain Python invocation a worker can run.
+    """
+    if len(argv) < 2 or not is_python(argv[0]):
+        return None
+    rest = argv[1:]
+    if rest[0] in ("-m", "-c"):
+        return (argv[0], rest) if len(rest) >= 2 else None
+    if rest[0].startswith("-"):
+        return None  # interpreter options cannot be applied to a running worker
+    return argv[0], rest
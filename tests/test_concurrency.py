@@ -0,0 +1,108 @@
+"""Tests for scipilot concurrency limits."""
+
+import asyncio
+import threading
+
+from scipilot.concurrency import ResourceScheduler, Slots
+from scipilot.models import Resources
+
+
+def test_slots_shared_between_threads_and_loop():
+    """Test a slot held by a thread blocks async waiters until released."""
+    slots = Slots(1)
+    slots.acquire()
+
+    async def waiter():
+        await slots.acquire_async()
+        slots.release()
+        return True
+
+    timer = threading.Timer(0.2, slots.release)
+    timer.start()
+    assert asyncio.run(asyncio.wait_for(waiter(), timeout=2))
+    assert slots.in_use == 0
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    """Test cancelling a queued acquire leaves the slot count intact."""
+    slots = Slots(1)
+
+    async def scenario():
+        await slots.acquire_async()
+        pending = asyncio.ensure_future(slots.acquire_async())
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        slots.release()
+
+    asyncio.run(scenario())
+    assert slots.in_use == 0
+    slots.acquire()
+    assert slots.in_use == 1
+
+
+def test_slots_wake_waiters_by_priority():
+    """Test a freed slot goes to the highest-priority waiter, FIFO within a priority."""
+    slots = Slots(1)
+    started = []
+
+    async def run(name, priority):
+        async with slots.hold_async(priority):
+            started.append(name)
+
+    async def scenario():
+        await slots.acquire_async()
+        tasks = [
+            asyncio.ensure_future(run(name, priority))
+            for name, priority in [("low", 0), ("high", 5), ("low2", 0)]
+        ]
+        await asyncio.sleep(0.05)
+        slots.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert started == ["high", "low", "low2"]
+
+
+def test_scheduler_priority_order():
+    """Test higher priority requests start first once resources free up."""
+    scheduler = ResourceScheduler(cpus=1, memory_mb=1000)
+    started = []
+
+    async def run(name, priority):
+        request = scheduler.request(Resources(cpus=1), walltime=10, priority=priority)
+        async with scheduler.hold_async(request):
+            started.append(name)
+
+    async def scenario():
+        blocker = scheduler.request(Resources(cpus=1), walltime=10)
+        await scheduler.acquire_async(blocker)
+        tasks = [asyncio.ensure_future(run("low", 0)), asyncio.ensure_future(run("high", 5))]
+        await asyncio.sleep(0.05)
+        scheduler.release(blocker)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert started == ["high", "low"]
+
+
+def test_scheduler_backfills_short_jobs_only():
+    """Test short jobs run around a blocked wide job, long ones wait behind it."""
+    scheduler = ResourceScheduler(cpus=4, memory_mb=1000)
+
+    async def scenario():
+        running = scheduler.request(Resources(cpus=2), walltime=100)
+        await scheduler.acquire_async(running)
+
+        wide = scheduler.request(Resources(cpus=4), walltime=100)
+        short = scheduler.request(Resources(cpus=2), walltime=10)
+        long = scheduler.request(Resources(cpus=2), walltime=1000)
+        waits = [asyncio.ensure_future(scheduler.acquire_async(r)) for r in (wide, long, short)]
+        await asyncio.sleep(0.05)
+        states = (wide.granted, long.granted, short.granted)
+        for task in waits:
+            task.cancel()
+        await asyncio.gather(*waits, return_exceptions=True)
+        return states
+
+    assert asyncio.run(scenario()) == (False, False, True)
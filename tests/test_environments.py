@@ -0,0 +1,58 @@
+"""Tests for conda environment snapshots."""
+
+import os
+
+from scipilot.executor import ToolExecutor
+from scipilot.models import EnvironmentConfig, Operation, OutputSpec, ToolDescriptor, ToolMetadata
+
+
+def fake_conda(tmp_path):
+    """A conda.sh whose `conda activate` sets variables and counts activations."""
+    prefix = tmp_path / "env"
+    (prefix / "conda-meta").mkdir(parents=True)
+    log = tmp_path / "activations.log"
+    script = tmp_path / "conda.sh"
+    script.write_text(
+        "conda() {\n"
+        f'  export CONDA_PREFIX="{prefix}"\n'
+        "  export SNAPSHOT_VAR=from_env\n"
+        f'  echo activated >> "{log}"\n'
+        "}\n"
+    )
+    return script, prefix, log
+
+
+def test_conda_environment_activated_once(tmp_path):
+    """Test runs reuse the captured environment until conda-meta changes."""
+    script, prefix, log = fake_conda(tmp_path)
+    tool = ToolDescriptor(
+        tool=ToolMetadata(
+            name="echo",
+            description="Test tool",
+            binary="echo",
+            environment=EnvironmentConfig(
+                type="conda", env_name="test", activate_script=str(script)
+            ),
+        ),
+        operations=[
+            Operation(
+                name="run",
+                description="Test operation",
+                command_template="{binary} var=$SNAPSHOT_VAR",
+                outputs=[OutputSpec(name="out", path="stdout", type="text")],
+                cacheable=False,
+            )
+        ],
+    )
+    executor = ToolExecutor(tmp_path / "runs")
+
+    for _ in range(3):
+        result = executor.execute(tool, tool.operations[0], {})
+        assert result.success and result.outputs["out"].strip() == "var=from_env"
+    assert log.read_text().count("activated") == 1
+
+    # Installing a package touches conda-meta
+    (prefix / "conda-meta" / "numpy.json").write_text("{}")
+    os.utime(prefix / "conda-meta", ns=(1, 1))
+    executor.execute(tool, tool.operations[0], {})
+    assert log.read_text().count("activated") == 2
@@ -0,0 +1,104 @@
+"""Tests for scipilot run eviction."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from scipilot.eviction import EvictionManager
+from scipilot.processes import RUN_DIR_VAR
+from scipilot.runs import write_run_meta
+
+
+def make_run(base, name, tool="raspa", size=1000, last_access=None, **meta):
+    """Create a finished run directory with a payload of the given size."""
+    run_dir = base / name
+    run_dir.mkdir(parents=True)
+    (run_dir / "output.data").write_bytes(b"x" * size)
+    write_run_meta(
+        run_dir,
+        {"tool": tool, "status": "succeeded", "last_access": last_access or time.time(), **meta},
+    )
+    return run_dir
+
+
+def test_budget_evicts_least_recently_used(tmp_path):
+    """Test the total budget evicts the oldest-accessed runs first."""
+    now = time.time()
+    old = make_run(tmp_path, "old", last_access=now - 300)
+    mid = make_run(tmp_path, "mid", last_access=now - 200)
+    new = make_run(tmp_path, "new", last_access=now - 100)
+
+    evicted = EvictionManager(tmp_path, max_bytes=2500).sweep()
+
+    assert evicted == [old]
+    assert mid.exists() and new.exists()
+
+
+def test_pinned_and_running_runs_survive(tmp_path):
+    """Test pinned and running runs are never evicted."""
+    now = time.time()
+    pinned = make_run(tmp_path, "pinned", last_access=now - 10_000, pinned=True)
+    running = make_run(tmp_path, "running", last_access=now - 10_000, status="running")
+    stale = make_run(tmp_path, "stale", last_access=now - 10_000)
+
+    evicted = EvictionManager(tmp_path, max_age=3600).sweep()
+
+    assert evicted == [stale]
+    assert pinned.exists() and running.exists()
+
+
+def test_tool_quota_and_lfu(tmp_path):
+    """Test per-tool quotas evict the least-used runs of that tool only."""
+    popular = make_run(tmp_path, "popular", hits=10)
+    unpopular = make_run(tmp_path, "unpopular", hits=1)
+    other = make_run(tmp_path, "other", tool="zeo")
+
+    manager = EvictionManager(tmp_path, policy="lfu", tool_quotas={"raspa": 1500})
+    evicted = manager.sweep()
+
+    assert evicted == [unpopular]
+    assert popular.exists() and other.exists()
+
+
+def test_abandoned_running_runs_evicted(tmp_path):
+    """Test runs left running by a dead server, or running for too long, are evictable."""
+    now = time.time()
+    exited = subprocess.Popen(["true"])
+    exited.wait()
+    old = {"last_access": now - 10_000, "status": "running"}
+    host = socket.gethostname()
+    live = make_run(tmp_path, "live", pid=os.getpid(), host=host, **old)
+    dead = make_run(tmp_path, "dead", pid=exited.pid, host=host, **old)
+    remote = make_run(tmp_path, "remote", pid=exited.pid, host=f"{host}-elsewhere", **old)
+    stale = make_run(tmp_path, "stale", created_at=now - 7200, **old)
+
+    evicted = EvictionManager(tmp_path, max_age=3600, stale_after=3600).sweep()
+
+    assert sorted(evicted) == sorted([dead, stale])
+    assert live.exists() and remote.exists()
+
+
+def test_abandoned_run_kept_while_its_processes_live(tmp_path):
+    """Test an abandoned run is not deleted while its processes still write to it."""
+    exited = subprocess.Popen(["true"])
+    exited.wait()
+    run = make_run(
+        tmp_path,
+        "run",
+        last_access=time.time() - 10_000,
+        status="running",
+        pid=exited.pid,
+        host=socket.gethostname(),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        env={**os.environ, RUN_DIR_VAR: str(run)},
+    )
+    try:
+        assert EvictionManager(tmp_path, max_age=3600).sweep() == []
+    finally:
+        process.kill()
+        process.wait()
+    assert EvictionManager(tmp_path, max_age=3600).sweep() == [run]
@@ -0,0 +1,414 @@
+"""Tests for scipilot executor."""
+
+import asyncio
+import time
+
+from fastmcp import Client, FastMCP
+
+from scipilot.cache import ResultCache
+from scipilot.executor import ToolExecutor
+from scipilot.convergence import block_std_error, converged_value
+from scipilot.models import (
+    InputSpec,
+    Operation,
+    OutputSpec,
+    Resources,
+    StopRule,
+    ToolDescriptor,
+    ToolMetadata,
+)
+from scipilot.server import create_tool_function
+
+
+def make_tool(command_template, inputs=None, outputs=None, **op_fields):
+    """Build a single-operation descriptor around a shell command."""
+    operation = Operation(
+        name="run",
+        description="Test operation",
+        command_template=command_template,
+        inputs=inputs or [],
+        outputs=outputs or [],
+        **op_fields,
+    )
+    return ToolDescriptor(
+        tool=ToolMetadata(name="echo", description="Test tool", binary="echo"),
+        operations=[operation],
+    )
+
+
+def test_execute_extracts_stdout(tmp_path):
+    """Test sync execution with stdout fallback extraction."""
+    tool = make_tool(
+        "{binary} value={x}",
+        inputs=[InputSpec(name="x", type="float")],
+        outputs=[
+            OutputSpec(
+                name="x", path="missing.txt", type="float", extract_pattern=r"value=([0-9.]+)"
+            )
+        ],
+    )
+    executor = ToolExecutor(tmp_path)
+    result = executor.execute(tool, tool.operations[0], {"x": 2.5})
+
+    assert result.success
+    assert result.outputs["x"] == 2.5
+
+
+def test_execute_async_runs_concurrently(tmp_path):
+    """Test async runs of a parallel operation overlap instead of queueing."""
+    tool = make_tool("sleep 0.5 && {binary} done", execution_mode="parallel", max_parallel=4)
+    executor = ToolExecutor(tmp_path)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(executor.execute_async(tool, tool.operations[0], {}) for _ in range(4))
+        )
+
+    start = time.monotonic()
+    results = asyncio.run(run_all())
+    elapsed = time.monotonic() - start
+
+    assert all(r.success for r in results)
+    assert elapsed < 1.5
+
+
+def test_execution_mode_limits_overlap(tmp_path):
+    """Test serial runs never overlap and parallel runs respect max_parallel."""
+
+    def elapsed_for(tool, count):
+        executor = ToolExecutor(tmp_path)
+
+        async def run_all():
+            await asyncio.gather(
+                *(executor.execute_async(tool, tool.operations[0], {}) for _ in range(count))
+            )
+
+        start = time.monotonic()
+        asyncio.run(run_all())
+        return time.monotonic() - start
+
+    assert elapsed_for(make_tool("sleep 0.3"), 3) >= 0.9
+    capped = make_tool("sleep 0.3", execution_mode="parallel", max_parallel=2)
+    assert 0.6 <= elapsed_for(capped, 4) < 1.2
+
+
+def test_priority_with_backlog_beyond_max_parallel(tmp_path):
+    """Test a high-priority run overtakes a backlog larger than max_parallel."""
+    order = tmp_path / "order.txt"
+    tool = make_tool(
+        f"echo {{x}} >> {order}; sleep 0.4",
+        inputs=[InputSpec(name="x", type="string")],
+        execution_mode="parallel",
+        resources=Resources(cpus=1),
+        cacheable=False,
+    )
+    executor = ToolExecutor(tmp_path / "runs", cpus=2, max_parallel=2)
+    operation = tool.operations[0]
+
+    async def scenario():
+        low = [
+            asyncio.ensure_future(executor.execute_async(tool, operation, {"x": f"low{i}"}))
+            for i in range(6)
+        ]
+        await asyncio.sleep(0.2)
+        high = executor.execute_async(tool, operation, {"x": "high"}, priority=10)
+        await asyncio.gather(high, *low)
+
+    asyncio.run(scenario())
+    assert order.read_text().split().index("high") == 2
+
+
+def test_execute_async_timeout(tmp_path):
+    """Test async timeout kills the process."""
+    tool = make_tool("sleep 2", timeout=1)
+    executor = ToolExecutor(tmp_path)
+
+    result = asyncio.run(executor.execute_async(tool, tool.operations[0], {}))
+
+    assert not result.success
+    assert "Timeout" in result.stderr
+
+
+def test_cache_hit_skips_rerun(tmp_path):
+    """Test identical runs are served from the result cache."""
+    tool = make_tool(
+        "{binary} value={x} $$",
+        inputs=[InputSpec(name="x", type="float")],
+        outputs=[OutputSpec(name="out", path="missing.txt", type="text")],
+    )
+    executor = ToolExecutor(tmp_path / "runs", cache=ResultCache(tmp_path / "cache"))
+    operation = tool.operations[0]
+
+    first = executor.execute(tool, operation, {"x": 1.0})
+    second = asyncio.run(executor.execute_async(tool, operation, {"x": 1.0}))
+    other = executor.execute(tool, operation, {"x": 2.0})
+
+    assert not first.cached
+    assert second.cached
+    assert second.outputs == first.outputs
+    assert not other.cached
+
+
+def test_cache_key_tracks_file_inputs(tmp_path):
+    """Test changing a file input's contents changes the cache key."""
+    tool = make_tool("cat {f}", inputs=[InputSpec(name="f", type="file")])
+    cache = ResultCache(tmp_path / "cache")
+    input_file = tmp_path / "input.txt"
+
+    input_file.write_text("a")
+    key_a = cache.make_key(tool, tool.operations[0], {"f": str(input_file)}, "cmd")
+    input_file.write_text("b")
+    key_b = cache.make_key(tool, tool.operations[0], {"f": str(input_file)}, "cmd")
+
+    assert key_a != key_b
+
+
+def test_cache_key_tracks_output_specs(tmp_path):
+    """Test changing how outputs are extracted misses the cache for the same command."""
+    executor = ToolExecutor(tmp_path / "runs", cache=ResultCache(tmp_path / "cache"))
+
+    def run(pattern):
+        tool = make_tool(
+            "{binary} a=1 b=2",
+            outputs=[OutputSpec(name="v", path="none", type="integer", extract_pattern=pattern)],
+        )
+        return executor.execute(tool, tool.operations[0], {})
+
+    first = run(r"a=(\d+)")
+    second = run(r"b=(\d+)")
+
+    assert not second.cached
+    assert (first.outputs, second.outputs) == ({"v": 1}, {"v": 2})
+
+
+def test_output_spooled_to_logs(tmp_path):
+    """Test stdout/stderr go to log files and previews show the stderr tail."""
+    tool = make_tool("seq 1 100000; {binary} head >&2; {binary} final error >&2; exit 3")
+    executor = ToolExecutor(tmp_path)
+
+    result = executor.execute(tool, tool.operations[0], {})
+
+    assert not result.success
+    assert result.stdout_path.stat().st_size > 500_000
+    assert result.stdout.endswith("100000\n")
+    assert result.to_dict()["stderr_preview"] == "head\nfinal error\n"
+
+
+def test_extract_from_output_files(tmp_path):
+    """Test regex extraction over mapped files, including empty and non-ASCII ones."""
+    tool = make_tool(
+        "printf 'Température\\n' > out.data; seq 1 50000 >> out.data;"
+        " printf 'Average energy: -12.5 K\\n' >> out.data; : > empty.data",
+        outputs=[
+            OutputSpec(
+                name="energy",
+                path="{working_dir}/out*.data",
+                type="float",
+                extract_pattern=r"Average energy:\s*([-+]?[0-9.]+)",
+            ),
+            OutputSpec(
+                name="count",
+                path="{working_dir}/empty.data",
+                type="integer",
+                extract_pattern=r"(\d+)",
+            ),
+            OutputSpec(name="head", path="{working_dir}/out.data", type="text"),
+        ],
+    )
+    executor = ToolExecutor(tmp_path)
+
+    result = executor.execute(tool, tool.operations[0], {})
+
+    assert result.outputs["energy"] == -12.5
+    assert result.outputs["count"] is None
+    assert result.outputs["head"].startswith("Température\n1\n")
+    assert len(result.outputs["head"]) == 10000
+
+
+def test_outputs_sharing_a_file_map_it_once(tmp_path, monkeypatch):
+    """Test several specs on the same glob resolve and map the file once."""
+    import scipilot.executor as executor_module
+
+    outputs = [
+        OutputSpec(
+            name=f"v{i}",
+            path="{working_dir}/*.data",
+            type="integer",
+            extract_pattern=rf"v{i}=(\d+)",
+        )
+        for i in range(5)
+    ]
+    tool = make_tool("printf 'v0=0 v1=1 v2=2 v3=3 v4=4' > out.data", outputs=outputs)
+
+    maps = []
+    real_map_file = executor_module._map_file
+
+    def counting_map_file(path):
+        maps.append(path)
+        return real_map_file(path)
+
+    monkeypatch.setattr(executor_module, "_map_file", counting_map_file)
+    result = ToolExecutor(tmp_path).execute(tool, tool.operations[0], {})
+
+    assert result.outputs == {f"v{i}": i for i in range(5)}
+    assert len(maps) == 1
+
+
+def test_search_from_end_and_anchor(tmp_path):
+    """Test tail-first and anchored extraction pick the final summary values."""
+    tool = make_tool(
+        "for i in 1 2 3; do echo \"Average energy: -$i.0\"; done > out.data;"
+        " seq 1 100000 >> out.data; echo 'Final summary' >> out.data;"
+        " echo 'Average energy: -9.5' >> out.data; echo 'Average energy: -8.5' >> out.data",
+        outputs=[
+            OutputSpec(
+                name=name,
+                path="{working_dir}/out.data",
+                type="float",
+                extract_pattern=r"Average energy:\s*([-+]?[0-9.]+)",
+                **options,
+            )
+            for name, options in [
+                ("first", {}),
+                ("last", {"search_from": "end"}),
+                ("after_anchor", {"search_from": "end", "anchor": "Final summary"}),
+                ("windowed", {"search_from": "end", "search_window": 10}),
+            ]
+        ],
+    )
+
+    result = ToolExecutor(tmp_path).execute(tool, tool.operations[0], {})
+
+    assert result.outputs == {
+        "first": -1.0,
+        "last": -8.5,
+        "after_anchor": -9.5,
+        "windowed": None,
+    }
+
+
+def test_argv_template_runs_without_shell(tmp_path):
+    """Test argv operations pass values as single arguments, sync and async."""
+    tool = make_tool(
+        "",
+        argv_template=["printf", "%s|", "{name}", "{label}", "--dir={working_dir}", "{missing}"],
+        inputs=[
+            InputSpec(name="name", type="string", arg_template="--name {value}"),
+            InputSpec(name="label", type="string"),
+            InputSpec(name="missing", type="string", required=False),
+        ],
+        outputs=[OutputSpec(name="out", path="stdout", type="text")],
+        cacheable=False,
+    )
+    executor = ToolExecutor(tmp_path)
+    inputs = {"name": "MIL 47; rm -rf /", "label": "$HOME `id`"}
+
+    result = executor.execute(tool, tool.operations[0], inputs)
+    async_result = asyncio.run(executor.execute_async(tool, tool.operations[0], inputs))
+
+    for res in (result, async_result):
+        assert res.success
+        assert res.outputs["out"] == f"--name|MIL 47; rm -rf /|$HOME `id`|--dir={res.run_id}|"
+
+
+def test_progress_reported_while_running(tmp_path, monkeypatch):
+    """Test progress and latest output values are reported before the run ends."""
+    monkeypatch.setattr(ToolExecutor, "progress_interval", 0.05)
+    tool = make_tool(
+        "for i in 1 2 3; do echo cycle $i; echo energy=-$i.5; sleep 0.3; done",
+        inputs=[InputSpec(name="cycles", type="integer", required=False, default=3)],
+        outputs=[
+            OutputSpec(name="energy", path="stdout", type="float", extract_pattern=r"energy=(\S+)")
+        ],
+        progress_pattern=r"cycle (\d+)",
+        progress_total="cycles",
+        cacheable=False,
+    )
+    executor = ToolExecutor(tmp_path)
+    updates = []
+
+    async def on_progress(update):
+        updates.append(update)
+
+    result = asyncio.run(executor.execute_async(tool, tool.operations[0], {}, progress=on_progress))
+
+    assert result.success and result.outputs["energy"] == -1.5
+    assert updates and all(update.total == 3 for update in updates)
+    assert [u.progress for u in updates] == sorted(u.progress for u in updates)
+    assert updates[-1].values["energy"] == -updates[-1].progress - 0.5
+    assert "energy=" in updates[-1].message
+
+
+def test_mcp_progress_only_with_progress_token(tmp_path, monkeypatch):
+    """Test MCP calls follow a run's progress only if the client sent a progress token."""
+    monkeypatch.setattr(ToolExecutor, "progress_interval", 0.05)
+    tool = make_tool("echo cycle 1; sleep 0.3", progress_pattern=r"cycle (\d+)", cacheable=False)
+    executor = ToolExecutor(tmp_path)
+    listened = []
+    execute_async = executor.execute_async
+
+    async def spy(*args, progress=None, **kwargs):
+        listened.append(progress is not None)
+        return await execute_async(*args, progress=progress, **kwargs)
+
+    monkeypatch.setattr(executor, "execute_async", spy)
+    handler = create_tool_function(tool, tool.operations[0], executor)
+    mcp = FastMCP("test")
+    mcp.tool(name=handler.__name__)(handler)
+    updates = []
+
+    async def on_progress(progress, total, message):
+        updates.append(progress)
+
+    async def scenario():
+        # Called in-process, without a request that could carry a token
+        await mcp.call_tool(handler.__name__, {})
+        async with Client(mcp) as client:
+            await client.call_tool(handler.__name__, {}, progress_handler=on_progress)
+
+    asyncio.run(scenario())
+    assert listened == [False, True]
+    assert updates == [1.0]
+
+
+def test_stop_rules():
+    """Test block-averaged error and windowed change rules."""
+    noisy = [1.0 + (0.1 if i % 2 else -0.1) for i in range(100)]
+    assert block_std_error(noisy, 5) < 1e-9  # alternation averages out within blocks
+    assert converged_value(StopRule(tolerance=1e-3, samples=50), noisy) == 1.0
+    assert converged_value(StopRule(tolerance=1e-3, samples=101), noisy) is None
+
+    drifting = [float(i) for i in range(20)]
+    assert converged_value(StopRule(tolerance=1.0, samples=10), drifting) is None
+    change = StopRule(criterion="change", tolerance=0.05, relative=True, samples=3)
+    assert converged_value(change, [5.0, 8.0, 9.9, 10.0, 10.1]) == 10.1
+    assert converged_value(change, [5.0, 8.0, 10.0]) is None
+
+
+def test_run_stopped_at_convergence(tmp_path, monkeypatch):
+    """Test a run is terminated once its output's stop rule is met."""
+    monkeypatch.setattr(ToolExecutor, "progress_interval", 0.05)
+    tool = make_tool(
+        "for i in $(seq 200); do echo value=0.2$i; sleep 0.05; done",
+        outputs=[
+            OutputSpec(
+                name="value",
+                path="stdout",
+                type="float",
+                extract_pattern=r"value=(\S+)",
+                stop_when=StopRule(criterion="change", tolerance=0.01, samples=5),
+            )
+        ],
+        cacheable=False,
+    )
+    executor = ToolExecutor(tmp_path)
+
+    start = time.monotonic()
+    result = asyncio.run(executor.execute_async(tool, tool.operations[0], {}))
+
+    assert time.monotonic() - start < 8
+    assert result.success and result.converged and result.return_code != 0
+    # 0.21 ... 0.29, then 0.210, 0.211, ...: first five values within 0.01 end at 0.214
+    assert 0.214 <= result.outputs["value"] < 0.22
+    assert "value=0.2200" not in result.stdout
+    assert result.to_dict()["converged"] is True
@@ -0,0 +1,79 @@
+"""Tests for scipilot background jobs."""
+
+import asyncio
+import inspect
+
+from scipilot.executor import ToolExecutor
+from scipilot.jobs import JobManager
+from scipilot.server import create_submit_function
+from tests.test_executor import make_tool
+
+
+def test_submit_and_wait(tmp_path):
+    """Test a submitted job returns immediately and finishes in the background."""
+    tool = make_tool("sleep 0.2 && {binary} done")
+    jobs = JobManager(ToolExecutor(tmp_path))
+
+    async def scenario():
+        job = jobs.submit(tool, tool.operations[0], {})
+        assert not job.done
+        await jobs.wait(job.job_id, timeout=5)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "succeeded"
+    assert job.result.success
+
+
+def test_cancel_running_job(tmp_path):
+    """Test cancelling a running job."""
+    tool = make_tool("sleep 2")
+    jobs = JobManager(ToolExecutor(tmp_path))
+
+    async def scenario():
+        job = jobs.submit(tool, tool.operations[0], {})
+        await asyncio.sleep(0.2)
+        assert jobs.cancel(job.job_id)
+        await jobs.wait(job.job_id, timeout=5)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "cancelled"
+    assert job.result is None
+
+
+def test_submit_tool_passes_priority(tmp_path):
+    """Test the generated submit tool exposes priority and hands it to the job."""
+    tool = make_tool("{binary} done")
+    jobs = JobManager(ToolExecutor(tmp_path))
+    submit = create_submit_function(tool, tool.operations[0], jobs)
+    assert inspect.signature(submit).parameters["priority"].default == 0
+
+    async def scenario():
+        handle = await submit(priority=5)
+        await jobs.wait(handle["job_id"], timeout=5)
+        return jobs.get(handle["job_id"])
+
+    job = asyncio.run(scenario())
+    assert job.priority == 5
+    assert job.status == "succeeded"
+
+
+def test_job_pending_until_run_starts(tmp_path):
+    """Test a job waiting behind a serial run reports pending, not running."""
+    tool = make_tool("sleep 0.5", cacheable=False)
+    jobs = JobManager(ToolExecutor(tmp_path))
+
+    async def scenario():
+        first = jobs.submit(tool, tool.operations[0], {})
+        second = jobs.submit(tool, tool.operations[0], {})
+        await asyncio.sleep(0.2)
+        assert (first.status, second.status) == ("running", "pending")
+        assert second.started_at is None
+        await jobs.wait(second.job_id, timeout=5)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second.status == "succeeded"
+    # Started once the first run released the tool's serial slot
+    assert (second.started_at - first.started_at).total_seconds() >= 0.4
@@ -37,3 +37,104 @@ def test_operation_inputs():
     assert len(op.inputs) == 2
     assert op.inputs[0].required is True
     assert op.inputs[1].default == 1.0
+
+
+def test_descriptor_cache(tmp_path, monkeypatch):
+    """Test unchanged descriptors come from the cache, changed ones are reparsed."""
+    import os
+    import shutil
+
+    import yaml
+
+    tools_dir = tmp_path / "tools"
+    tools_dir.mkdir()
+    descriptor = tools_dir / "raspa.yaml"
+    shutil.copy("examples/raspa.yaml", descriptor)
+    cache_dir = tmp_path / "cache"
+
+    ToolRegistry(tools_dir, cache_dir=cache_dir).load_all()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("descriptor was reparsed")
+
+    # Unchanged and touched-but-identical files skip YAML parsing entirely
+    with monkeypatch.context() as m:
+        m.setattr(yaml, "load", fail)
+        registry = ToolRegistry(tools_dir, cache_dir=cache_dir)
+        registry.load_all()
+        assert registry.get("raspa").operations[0]._plan is not None
+
+        os.utime(descriptor, ns=(1, 1))
+        assert "raspa" in ToolRegistry(tools_dir, cache_dir=cache_dir).load_all()
+
+    descriptor.write_text(descriptor.read_text().replace("name: raspa", "name: raspa2", 1))
+    assert "raspa2" in ToolRegistry(tools_dir, cache_dir=cache_dir).load_all()
+
+
+def test_parallel_load_reports_errors_per_file(tmp_path, monkeypatch, capsys):
+    """Test descriptors parsed on a process pool, with one bad file."""
+    import scipilot.tool_loader as tool_loader
+
+    monkeypatch.setattr(tool_loader, "PARALLEL_LOAD_MIN_FILES", 2)
+    template = open("examples/raspa.yaml").read()
+    for i in range(4):
+        descriptor = template.replace("name: raspa", f"name: tool{i}", 1)
+        (tmp_path / f"tool{i}.yaml").write_text(descriptor)
+    (tmp_path / "broken.yaml").write_text("name: [unterminated")
+
+    tools = ToolRegistry(tmp_path, max_workers=2).load_all()
+
+    assert sorted(tools) == ["tool0", "tool1", "tool2", "tool3"]
+    assert tools["tool2"].operations[0]._plan is not None
+    assert "Error loading" in capsys.readouterr().out
+
+
+def test_refresh_reloads_only_changed_files(tmp_path):
+    """Test refresh reports added, updated and removed tools."""
+    import os
+
+    template = open("examples/raspa.yaml").read()
+    first = tmp_path / "a.yaml"
+    first.write_text(template.replace("name: raspa", "name: a", 1))
+    registry = ToolRegistry(tmp_path)
+    registry.load_all()
+    assert not registry.refresh()
+
+    second = tmp_path / "b.yaml"
+    second.write_text(template.replace("name: raspa", "name: b", 1))
+    changes = registry.refresh()
+    assert (changes.added, changes.updated, changes.removed) == (["b"], [], [])
+
+    old = registry.get("a")
+    first.write_text(template.replace("name: raspa", "name: a", 1) + "\n")
+    changes = registry.refresh()
+    assert changes.updated == ["a"] and registry.get("a") is not old
+
+    # An invalid edit keeps the last good version
+    second.write_text("name: [unterminated")
+    os.utime(second, ns=(1, 1))
+    assert not registry.refresh() and registry.get("b") is not None
+
+    second.unlink()
+    assert registry.refresh().removed == ["b"]
+    assert [tool.name for tool in registry.list_tools()] == ["a"]
+
+
+def test_operation_lookup_follows_refresh(tmp_path):
+    """Test the operation map and listings are rebuilt when descriptors change."""
+    template = open("examples/raspa.yaml").read()
+    (tmp_path / "raspa.yaml").write_text(template)
+    registry = ToolRegistry(tmp_path)
+    registry.load_all()
+
+    operation = registry.get_operation("raspa", "run_helium_void_fraction")
+    assert operation is registry.get("raspa").operations[0]
+    assert registry.get_operation("raspa", "missing") is None
+    listing = registry.list_operations()
+    assert ("raspa", "run_helium_void_fraction") in listing
+    assert registry.list_operations() is listing
+
+    (tmp_path / "raspa.yaml").unlink()
+    registry.refresh()
+    assert registry.get_operation("raspa", "run_helium_void_fraction") is None
+    assert registry.list_operations() == ()
@@ -0,0 +1,80 @@
+"""Tests for scipilot execution plans."""
+
+from pathlib import Path
+
+import pytest
+
+from scipilot.models import InputSpec, Operation, OutputSpec
+from scipilot.plan import Template, compile_operation
+from scipilot.tool_loader import ToolRegistry
+
+
+def test_template_renders_like_str_format():
+    """Test precompiled templates match str.format, including escapes and specs."""
+    source = 'echo "${{HOME}}" {x:.2f} {name!r} {x}'
+    template = Template.parse(source, frozenset({"x", "name"}), "test")
+
+    values = {"x": 1.23456, "name": "mof"}
+    assert template.render(values) == source.format(**values)
+    assert template.fields == {"x", "name"}
+
+
+def test_example_plans_compiled_at_load():
+    """Test the registry attaches plans to every loaded operation."""
+    registry = ToolRegistry(Path("./examples"))
+    registry.load_all()
+
+    for operation in registry.get("raspa").operations:
+        assert operation._plan is not None
+        assert operation._plan.outputs[0].is_glob
+
+
+def test_unknown_placeholders_rejected():
+    """Test typos in templates fail at compile time, not mid-run."""
+    with pytest.raises(ValueError, match="unknown placeholder {temprature}"):
+        compile_operation(
+            Operation(
+                name="op",
+                description="",
+                command_template="sim --temp {temprature}",
+                inputs=[InputSpec(name="temperature", type="float")],
+            )
+        )
+
+    with pytest.raises(ValueError, match="invalid extract_pattern"):
+        compile_operation(
+            Operation(
+                name="op",
+                description="",
+                command_template="sim",
+                outputs=[OutputSpec(name="e", path="out", type="float", extract_pattern="(")],
+            )
+        )
+
+
+def test_operation_needs_a_command():
+    """Test an operation without command_template or argv_template fails to compile."""
+    with pytest.raises(ValueError, match="argv_template"):
+        compile_operation(Operation(name="op", description=""))
+    with pytest.raises(ValueError, match=r"argv_template\[1\]: unknown placeholder"):
+        compile_operation(Operation(name="op", description="", argv_template=["ls", "{nope}"]))
+
+
+def test_arg_words_only_for_argv_operations():
+    """Test arg_templates are split into words only when an argv_template uses them."""
+    # An unbalanced quote is fine for shell command lines, which never split it
+    inputs = [InputSpec(name="title", type="string", arg_template="--title '{value}")]
+    plan = compile_operation(
+        Operation(name="op", description="", command_template="sim {title}", inputs=inputs)
+    )
+    assert plan.inputs[0].arg_words == ()
+
+    plan = compile_operation(
+        Operation(
+            name="op",
+            description="",
+            argv_template=["sim", "{x}"],
+            inputs=[InputSpec(name="x", type="integer", arg_template="-x {value}")],
+        )
+    )
+    assert [word.source for word in plan.inputs[0].arg_words] == ["-x", "{value}"]
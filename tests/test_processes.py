@@ -0,0 +1,119 @@
+"""Tests for process-group termination and orphan reaping."""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from scipilot.executor import ToolExecutor
+from scipilot.processes import RUN_DIR_VAR, OrphanReaper, group_members
+from scipilot.runs import write_run_meta
+
+from tests.test_executor import make_tool
+
+# A shell whose background child ignores SIGTERM and outlives it
+STUBBORN = "echo $$ > pgid.txt; (trap '' TERM; sleep 60) & sleep 60"
+
+
+def _pgid(result):
+    with open(os.path.join(result.run_id, "pgid.txt")) as f:
+        return int(f.read())
+
+
+def test_timeout_kills_whole_group(tmp_path):
+    """Test a timed-out run's grandchildren are killed too, after the grace period."""
+    tool = make_tool(STUBBORN, timeout=1, cacheable=False)
+    executor = ToolExecutor(tmp_path, kill_grace=0.5)
+
+    start = time.monotonic()
+    result = executor.execute(tool, tool.operations[0], {})
+
+    assert not result.success and "Timeout" in result.stderr
+    assert time.monotonic() - start < 10
+    assert group_members(_pgid(result)) == []
+
+
+def test_cancel_kills_whole_group(tmp_path):
+    """Test cancelling an async run stops every process of its group."""
+    tool = make_tool(STUBBORN, cacheable=False)
+    executor = ToolExecutor(tmp_path, kill_grace=0.5)
+
+    async def cancel_after_start():
+        task = asyncio.create_task(executor.execute_async(tool, tool.operations[0], {}))
+        while not list(tmp_path.glob("*/echo/*/pgid.txt")):
+            await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_after_start())
+
+    (pgid_file,) = tmp_path.glob("*/echo/*/pgid.txt")
+    assert group_members(int(pgid_file.read_text())) == []
+
+
+def test_background_leftovers_reaped(tmp_path):
+    """Test processes a finished run left behind in its group are terminated."""
+    tool = make_tool("echo $$ > pgid.txt; sleep 60 &", cacheable=False)
+    result = ToolExecutor(tmp_path, kill_grace=0.5).execute(tool, tool.operations[0], {})
+
+    assert result.success
+    assert group_members(_pgid(result)) == []
+
+
+def test_orphan_reaper(tmp_path):
+    """Test processes tagged with a finished run are reaped, running ones are kept."""
+    finished, running = tmp_path / "finished", tmp_path / "running"
+    write_run_meta(finished, {"status": "succeeded"})
+    write_run_meta(running, {"status": "running"})
+
+    def spawn(run_dir):
+        # A new session, as a daemonizing launcher would start
+        return subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(60)"],
+            env={**os.environ, RUN_DIR_VAR: str(run_dir)},
+            start_new_session=True,
+        )
+
+    orphan, active = spawn(finished), spawn(running)
+    try:
+        deadline = time.monotonic() + 5
+        reaped = {}
+        while not reaped and time.monotonic() < deadline:
+            reaped = OrphanReaper(tmp_path, grace=0.5).sweep()
+        assert reaped == {str(finished): [orphan.pid]}
+        assert orphan.wait(timeout=5) != 0
+        assert active.poll() is None
+    finally:
+        for process in (orphan, active):
+            process.kill()
+            process.wait()
+
+
+def test_orphan_reaper_stops_runs_of_dead_servers(tmp_path):
+    """Test processes of a run left running by a server that exited are reaped."""
+    server = subprocess.Popen(["true"])
+    server.wait()
+    abandoned = tmp_path / "abandoned"
+    write_run_meta(
+        abandoned, {"status": "running", "pid": server.pid, "host": socket.gethostname()}
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        env={**os.environ, RUN_DIR_VAR: str(abandoned)},
+        start_new_session=True,
+    )
+    try:
+        deadline = time.monotonic() + 5
+        reaped = {}
+        while not reaped and time.monotonic() < deadline:
+            reaped = OrphanReaper(tmp_path, grace=0.5).sweep()
+        assert reaped == {str(abandoned): [process.pid]}
+        assert process.wait(timeout=5) != 0
+    finally:
+        process.kill()
+        process.wait()
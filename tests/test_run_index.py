@@ -0,0 +1,33 @@
+"""Tests for scipilot run index."""
+
+import time
+
+from scipilot.executor import ToolExecutor
+from scipilot.models import InputSpec, OutputSpec
+from scipilot.run_index import RunIndex
+from tests.test_executor import make_tool
+
+
+def test_executor_records_runs(tmp_path):
+    """Test every execution lands in the index with inputs and outputs."""
+    tool = make_tool(
+        "{binary} value={x}",
+        inputs=[InputSpec(name="x", type="float"), InputSpec(name="label", type="string")],
+        outputs=[
+            OutputSpec(name="y", path="none", type="float", extract_pattern=r"value=([0-9.]+)")
+        ],
+    )
+    index = RunIndex(tmp_path / "index.sqlite")
+    executor = ToolExecutor(tmp_path / "runs", run_index=index)
+    for x in (1.0, 2.0, 3.0):
+        executor.execute(tool, tool.operations[0], {"x": x, "label": "iso"})
+
+    runs = index.query(tool="echo")
+    assert len(runs) == 3
+    assert runs[0]["inputs"] == {"x": 3.0, "label": "iso"}
+    assert runs[0]["outputs"] == {"y": 3.0}
+    assert runs[0]["status"] == "succeeded"
+
+    assert len(index.query(inputs={"x": {"min": 2}})) == 2
+    assert len(index.query(inputs={"x": 1.0, "label": "iso"})) == 1
+    assert index.query(since=time.time() + 60) == []
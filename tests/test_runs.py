@@ -0,0 +1,33 @@
+"""Tests for scipilot run IDs and run directory layout."""
+
+from scipilot.runs import (
+    is_run_id,
+    iter_run_dirs,
+    new_run_id,
+    resolve_run_dir,
+    run_dir_for,
+)
+
+
+def test_run_ids_are_unique_and_sorted():
+    """Test run IDs generated back to back are strictly increasing."""
+    ids = [new_run_id() for _ in range(1000)]
+    assert all(is_run_id(run_id) for run_id in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_resolver_handles_new_and_legacy_runs(tmp_path):
+    """Test run IDs, paths and old flat directory names all resolve."""
+    run_id = new_run_id()
+    sharded = run_dir_for(tmp_path, "raspa", "widom", run_id)
+    sharded.mkdir(parents=True)
+    legacy = tmp_path / "raspa_widom_20250101_120000"
+    legacy.mkdir()
+    (tmp_path / ".cache").mkdir()
+
+    assert resolve_run_dir(tmp_path, run_id) == sharded
+    assert resolve_run_dir(tmp_path, str(sharded)) == sharded
+    assert resolve_run_dir(tmp_path, legacy.name) == legacy
+    assert resolve_run_dir(tmp_path, new_run_id()) is None
+    assert sorted(iter_run_dirs(tmp_path)) == sorted([sharded, legacy])
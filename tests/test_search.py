@@ -0,0 +1,103 @@
+"""Tests for the operation search index and lazy tool registration."""
+
+import asyncio
+import inspect
+import time
+
+from fastmcp import Client
+from fastmcp.client.messages import MessageHandler
+
+from scipilot.models import ToolDescriptor
+from scipilot.search import ToolIndex
+from scipilot.server import ServerConfig, create_server
+
+
+def make_tool(name, operations):
+    return ToolDescriptor(
+        tool={"name": name, "description": f"{name} package", "binary": name},
+        operations=[
+            {
+                "name": op,
+                "description": description,
+                "command_template": "{binary}",
+                "inputs": [{"name": inp, "type": "float", "description": ""} for inp in inputs],
+            }
+            for op, description, inputs in operations
+        ],
+    )
+
+
+def test_search_ranks_names_and_rare_words_first():
+    """Test ranking, prefix matches, pagination and re-indexing."""
+    index = ToolIndex(
+        [
+            make_tool("raspa", [("void_fraction", "Helium void fraction", ["temperature"])]),
+            make_tool("lammps", [("minimize", "Energy minimization", ["steps"])]),
+            make_tool("cp2k", [("geometry", "Optimize geometry at a temperature", [])]),
+        ]
+    )
+
+    total, hits = index.search("temperature")
+    assert total == 2
+    # Input name beats a description word
+    assert (hits[0].tool, hits[0].operation) == ("raspa", "void_fraction")
+
+    assert [hit.tool for hit in index.search("minim")[1]] == ["lammps"]
+    assert index.search("nothing here") == (0, [])
+
+    total, page = index.search("temperature", limit=1, offset=1)
+    assert total == 2 and page[0].tool == "cp2k"
+
+    index.add_tool(make_tool("raspa", [("adsorption", "GCMC isotherm", [])]))
+    assert [hit.tool for hit in index.search("temperature")[1]] == ["cp2k"]
+    index.remove_tool("cp2k")
+    assert len(index) == 2
+
+
+def test_large_catalog_registers_operations_on_demand(tmp_path):
+    """Test operation tools appear only after load_operation above the eager limit."""
+    tools_dir = tmp_path / "tools"
+    tools_dir.mkdir()
+    (tools_dir / "calc.yaml").write_text(
+        """
+tool:
+  name: calc
+  description: Calculator
+  binary: echo
+operations:
+  - name: add
+    description: Add numbers
+    command_template: "{binary} add"
+  - name: multiply
+    description: Multiply numbers
+    command_template: "{binary} mul"
+"""
+    )
+    config = ServerConfig(runs_dir=tmp_path / "runs", eager_tool_limit=1)
+    mcp = create_server(tools_dir, config)
+
+    def names():
+        return {tool.name for tool in asyncio.run(mcp.list_tools())}
+
+    assert "calc_add" not in names()
+    found = asyncio.run(mcp.call_tool("search_tools", {"query": "multiply"}))
+    assert found.structured_content["results"][0]["operation"] == "multiply"
+
+    notified = []
+
+    class Handler(MessageHandler):
+        async def on_tool_list_changed(self, message):
+            notified.append(message)
+
+    async def load():
+        legacy = {"mode": "legacy"} if "mode" in inspect.signature(Client).parameters else {}
+        async with Client(mcp, message_handler=Handler(), **legacy) as client:
+            await client.call_tool("load_operation", {"tool_name": "calc", "operation_name": "add"})
+            deadline = time.monotonic() + 5
+            while not notified and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+    asyncio.run(load())
+    assert {"calc_add", "calc_add_submit", "calc_add_sweep"} <= names()
+    assert "calc_multiply" not in names()
+    assert len(notified) == 1
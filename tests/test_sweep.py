@@ -0,0 +1,79 @@
+"""Tests for scipilot parameter sweeps."""
+
+import asyncio
+
+import pytest
+
+from scipilot.executor import ToolExecutor
+from scipilot.models import InputSpec, OutputSpec
+from scipilot.sweep import build_points, count_points, expand_values, run_sweep
+from tests.test_executor import make_tool
+
+
+def test_expand_values():
+    """Test grid entry expansion."""
+    assert expand_values([1, 2]) == [1, 2]
+    assert expand_values({"start": 100, "stop": 300, "step": 100}) == [100, 200, 300]
+    assert expand_values({"start": 0.0, "stop": 1.0, "num": 3}) == [0.0, 0.5, 1.0]
+    assert expand_values(5) == [5]
+
+
+def test_build_points_modes():
+    """Test cartesian, zip and latin hypercube point generation."""
+    grid = {"a": [1, 2], "b": [10, 20]}
+    assert len(build_points(grid, "cartesian")) == 4
+    assert build_points(grid, "zip") == [{"a": 1, "b": 10}, {"a": 2, "b": 20}]
+
+    points = build_points({"t": {"min": 0.0, "max": 10.0}}, "latin_hypercube", samples=5, seed=1)
+    strata = sorted(int(p["t"] // 2) for p in points)
+    assert strata == [0, 1, 2, 3, 4]
+
+    with pytest.raises(ValueError):
+        build_points({"a": [1, 2], "b": [1]}, "zip")
+
+
+def test_run_sweep_table(tmp_path):
+    """Test a sweep returns one row per point with extracted outputs."""
+    tool = make_tool(
+        "{binary} value={x}",
+        inputs=[InputSpec(name="x", type="integer")],
+        outputs=[
+            OutputSpec(name="y", path="none", type="integer", extract_pattern=r"value=(\d+)")
+        ],
+    )
+    executor = ToolExecutor(tmp_path)
+
+    table = asyncio.run(
+        run_sweep(executor, tool, tool.operations[0], {"x": [1, 2, 3]}, max_concurrency=2)
+    )
+
+    assert table["columns"] == ["x", "success", "y", "run_id"]
+    assert [row[2] for row in table["rows"]] == [1, 2, 3]
+    assert table["failed"] == 0
+
+
+def test_count_points_without_building(tmp_path):
+    """Test sweep sizes come from axis lengths, so huge ranges are never expanded."""
+    huge = {"start": 0, "stop": 10**12, "step": 1}
+    assert count_points({"a": huge, "b": [1, 2]}) == 2 * (10**12 + 1)
+    assert count_points({"a": {"start": 0.0, "stop": 1.0, "num": 10**9}}, "zip") == 10**9
+    assert count_points({"t": {"min": 0, "max": 1}, "a": huge}, "latin_hypercube", 8) == 8
+
+    with pytest.raises(ValueError):
+        count_points({"a": {"start": 0, "stop": 1, "step": 0}})
+
+    tool = make_tool("{binary} {x}", inputs=[InputSpec(name="x", type="integer")])
+    with pytest.raises(ValueError, match="limit"):
+        asyncio.run(run_sweep(ToolExecutor(tmp_path), tool, tool.operations[0], {"x": huge}))
+
+
+def test_latin_hypercube_indexes_long_ranges():
+    """Test discrete axes are sampled by index, so a huge range is never expanded."""
+    stop = 10**12
+    points = build_points(
+        {"a": {"start": 0, "stop": stop, "step": 1}}, "latin_hypercube", samples=4, seed=3
+    )
+
+    strata = sorted(p["a"] * 4 // (stop + 1) for p in points)
+    assert strata == [0, 1, 2, 3]
+    assert all(isinstance(p["a"], int) for p in points)
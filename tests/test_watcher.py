@@ -0,0 +1,91 @@
+"""Tests for hot reload of tool descriptors."""
+
+import asyncio
+import inspect
+import time
+
+from fastmcp import Client
+from fastmcp.client.messages import MessageHandler
+
+from scipilot.server import ServerConfig, create_server
+from scipilot.tool_loader import ToolRegistry
+from scipilot.watcher import DescriptorWatcher
+
+
+def descriptor(name, operation="run"):
+    return f"""
+tool:
+  name: {name}
+  description: Test tool
+  binary: echo
+operations:
+  - name: {operation}
+    description: Echo
+    command_template: "{{binary}} hi"
+"""
+
+
+def tool_names(mcp):
+    return {tool.name for tool in asyncio.run(mcp.list_tools())}
+
+
+def test_polling_watcher_reports_changes(tmp_path):
+    """Test the polling fallback notices a new descriptor."""
+    (tmp_path / "a.yaml").write_text(descriptor("a"))
+    registry = ToolRegistry(tmp_path)
+    registry.load_all()
+    seen = []
+
+    watcher = DescriptorWatcher(registry, seen.append, interval=0.05, use_notify=False)
+    watcher.start()
+    try:
+        (tmp_path / "b.yaml").write_text(descriptor("b"))
+        deadline = time.monotonic() + 5
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+
+    assert seen and seen[0].added == ["b"]
+
+
+def test_server_reregisters_changed_tools(tmp_path, monkeypatch):
+    """Test MCP tools follow descriptor edits on the server loop, and clients are notified."""
+    tools_dir = tmp_path / "tools"
+    tools_dir.mkdir()
+    (tools_dir / "a.yaml").write_text(descriptor("a"))
+
+    watchers = []
+    monkeypatch.setattr(DescriptorWatcher, "start", lambda self: watchers.append(self))
+    mcp = create_server(tools_dir, ServerConfig(runs_dir=tmp_path / "runs", watch_tools=True))
+    assert "a_run" in tool_names(mcp)
+
+    notified = []
+
+    class Handler(MessageHandler):
+        async def on_tool_list_changed(self, message):
+            notified.append(message)
+
+    async def scenario():
+        # list_changed reaches clients over a session; FastMCP 4 also speaks a sessionless era
+        legacy = {"mode": "legacy"} if "mode" in inspect.signature(Client).parameters else {}
+        async with Client(mcp, message_handler=Handler(), **legacy) as client:
+            assert "a_run" in {tool.name for tool in await client.list_tools()}
+            (tools_dir / "a.yaml").write_text(descriptor("a", operation="go"))
+            (tools_dir / "b.yaml").write_text(descriptor("b"))
+            # As the watcher thread does; returns once the loop has swapped the tools
+            await asyncio.to_thread(watchers[0].check)
+            names = {tool.name for tool in await client.list_tools()}
+            assert {"a_go", "a_go_submit", "a_go_sweep", "b_run"} <= names
+            assert "a_run" not in names
+
+            (tools_dir / "b.yaml").unlink()
+            await asyncio.to_thread(watchers[0].check)
+            assert "b_run" not in {tool.name for tool in await client.list_tools()}
+
+            deadline = time.monotonic() + 5
+            while len(notified) < 2 and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert len(notified) == 2
@@ -0,0 +1,80 @@
+"""Tests for persistent Python workers."""
+
+import asyncio
+import sys
+
+from scipilot.executor import ToolExecutor
+from scipilot.models import InputSpec, Operation, OutputSpec, ToolDescriptor, ToolMetadata
+
+SCRIPT = """
+import os
+import sys
+import time
+
+if sys.argv[1] == "sleep":
+    time.sleep(5)
+with open("arg.txt", "w") as f:
+    f.write(sys.argv[1])
+print("pid", os.getpid())
+sys.exit(3 if sys.argv[1] == "fail" else 0)
+"""
+
+
+def python_tool(tmp_path, **worker):
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT)
+    return ToolDescriptor(
+        tool=ToolMetadata(
+            name="py",
+            description="Python tool",
+            binary=sys.executable,
+            persistent=True,
+            worker=worker,
+        ),
+        operations=[
+            Operation(
+                name="run",
+                description="Run script",
+                argv_template=["{binary}", str(script), "{arg}"],
+                inputs=[InputSpec(name="arg", type="string")],
+                outputs=[
+                    OutputSpec(
+                        name="pid", path="stdout", type="integer", extract_pattern=r"pid (\d+)"
+                    ),
+                    OutputSpec(name="arg", path="{working_dir}/arg.txt", type="text"),
+                ],
+                cacheable=False,
+                timeout=1,
+            )
+        ],
+    )
+
+
+def test_worker_reused_and_recycled(tmp_path):
+    """Test calls share a worker until max_calls, with per-call cwd, argv and exit code."""
+    tool = python_tool(tmp_path, max_calls=2)
+    operation = tool.operations[0]
+    executor = ToolExecutor(tmp_path / "runs")
+
+    first = executor.execute(tool, operation, {"arg": "a"})
+    second = asyncio.run(executor.execute_async(tool, operation, {"arg": "b"}))
+    third = executor.execute(tool, operation, {"arg": "fail"})
+
+    assert first.success and first.outputs["arg"] == "a"
+    assert second.success and second.outputs["arg"] == "b"
+    assert first.outputs["pid"] == second.outputs["pid"]
+    assert third.return_code == 3 and third.outputs["pid"] != first.outputs["pid"]
+
+
+def test_worker_timeout_replaces_worker(tmp_path):
+    """Test a call running past the timeout kills its worker."""
+    tool = python_tool(tmp_path)
+    operation = tool.operations[0]
+    executor = ToolExecutor(tmp_path / "runs")
+
+    before = executor.execute(tool, operation, {"arg": "a"})
+    timed_out = executor.execute(tool, operation, {"arg": "sleep"})
+    after = executor.execute(tool, operation, {"arg": "b"})
+
+    assert "Timeout" in timed_out.stderr
+    assert after.success and after.outputs["pid"] != before.outputs["pid"]